@@ -9,16 +9,26 @@ Proyecto Wearable IoT con ESP32
 import time
 import network
 import machine
-from machine import Pin, I2C, PWM, ADC
+from machine import Pin, I2C, PWM, ADC, Timer
+from array import array
 import ubinascii
 from umqtt.simple import MQTTClient
 import json
 import gc
 import urequests
+import uasyncio as asyncio
+try:
+    import _thread
+except ImportError:
+    _thread = None
 
 # Importar las librerías de los sensores
 from mlx90614 import MLX90614
 from ssd1306 import SSD1306_I2C
+from display_backend import TextLines
+from pulso import BeatDetector, PulseSampler
+from tareas import Queue, TaskStats, periodic, report
+from alarmas import AlarmEngine
 
 # URL del servicio web para enviar correos (reemplaza con tu URL de Apps Script)
 WEBAPP_URL = "https://script.google.com/macros/s/TU_ID_DE_SCRIPT/exec"
@@ -38,6 +48,7 @@ I2C_SDA_PIN = 16
 I2C_SCL_PIN = 17
 BUZZER_PIN = 5
 KY039_PIN = 34  # Pin analógico para el sensor KY-039 (ADC1_CH0)
+KY039_TIMER = 0  # Timer de hardware que muestrea el KY-039
 LED_ALERT_PIN = 4  # Usa el GPIO que tú decidas, por ejemplo el GPIO2
 led_alert = Pin(LED_ALERT_PIN, Pin.OUT)
 
@@ -49,16 +60,50 @@ HR_MIN = 60      # BPM
 HR_MAX = 100     # BPM
 SPO2_MIN = 95    # % (Valor simulado ya que KY-039 no mide SpO2)
 SPO2_MAX = 100   # %
+# Umbrales de severidad alta: la alarma repite más seguido
+TEMP_CRIT = 39.5  # °C
+HR_CRIT_MIN = 40  # BPM
+HR_CRIT_MAX = 140 # BPM
+SPO2_CRIT = 90    # %
+
+# Patrones de alarma: (prioridad, pasos en ms encendido/apagado, frecuencia Hz)
+# El número de pitidos es también el código de destellos del LED de alerta
+ALARM_PATTERNS = {
+    'temp': (1, (150, 150), 2000),                      # 1 destello
+    'hr': (2, (150, 150, 150, 150), 2500),              # 2 destellos
+    'spo2': (3, (150, 150, 150, 150, 150, 150), 3000),  # 3 destellos
+}
+ALARM_PAUSE = 2000  # ms entre repeticiones; se divide con la severidad
 
 # Variables para control de alertas por correo
 last_email_time = 0
 EMAIL_INTERVAL = 60  # Enviar correo como máximo cada 60 segundos
+email_busy = False  # Hay un correo enviándose en otro hilo
+# Pila del hilo del correo: el handshake TLS no cabe en la pila por defecto
+EMAIL_STACK = 32 * 1024
+
+# Periodo de cada tarea en ms
+TEMP_PERIOD = 500    # Lectura del MLX90614
+DSP_PERIOD = 50      # Procesar los bloques del KY-039
+GC_PERIOD = 1000     # Recolectar basura en un momento predecible
+UI_PERIOD = 200      # Redibujar la pantalla
+MQTT_PERIOD = 5000   # Publicar en MQTT
+STATS_PERIOD = 30000 # Reporte de estadísticas de las tareas
+
+# Las tareas no comparten variables: los sensores mandan ('temp', valor)
+# o ('hr', valor) al monitor, que reparte (temp, hr, spo2, alertas) a la
+# pantalla, a MQTT y a los correos, cada uno con su propia cola
+last_heart_rate = None  # Último BPM enviado al monitor
+last_published = None  # Último estado publicado en MQTT
 
 # Variables para el sensor KY-039
-pulse_readings = []
-MAX_SAMPLES = 300  # Número de muestras para calcular BPM
-last_beat = 0
-beat_interval = 0
+SAMPLE_RATE = 200  # Muestras por segundo del KY-039
+BLOCK_SIZE = 32  # Muestras que se procesan por bloque
+# Filtro, umbral adaptativo y mediana de intervalos; bpm es 0 sin pulso
+pulse_detector = BeatDetector(SAMPLE_RATE)
+# Bloques reutilizables para leer el muestreador sin asignar memoria
+block_values = array('H', [0] * BLOCK_SIZE)
+block_times = array('L', [0] * BLOCK_SIZE)
 
 # Inicialización del bus I2C
 i2c = I2C(0, sda=Pin(I2C_SDA_PIN), scl=Pin(I2C_SCL_PIN), freq=100000)
@@ -163,135 +208,100 @@ def setup_mqtt():
         print("Error al conectar a MQTT:", e)
         return None
 
-# Función para activar la alarma
-def sound_alarm(buzzer, duration=0.5):
-    if buzzer:
-        try:
-            buzzer.duty(512)  # 50% duty cycle (volumen medio)
-            time.sleep(duration)
-            buzzer.duty(0)    # Apagar
-        except Exception as e:
-            print("Error en buzzer:", e)
+# Crea el motor de alarmas con los patrones declarados
+def init_alarms(buzzer):
+    engine = AlarmEngine(buzzer, led_alert)
+    for name, (priority, steps, freq) in ALARM_PATTERNS.items():
+        engine.define(name, priority, steps, freq, ALARM_PAUSE)
+    return engine
 
 # Verificar si los valores están fuera de rango
+# Regresa los mensajes de alerta y las alarmas activas con su severidad
 def check_values(temp, heart_rate, spo2):
-    global last_email_time
-    current_time = time.time()
-    
     alerts = []
+    alarms = {}
     
     if temp < TEMP_MIN:
         alerts.append(f"¡ALERTA! Temperatura baja: {temp:.1f}°C")
-        led_alert.on()
+        alarms['temp'] = 0
     elif temp > TEMP_MAX:
         alerts.append(f"¡ALERTA! Temperatura alta: {temp:.1f}°C")
-        led_alert.onn()
-    else:
-        led_alert.off()
+        alarms['temp'] = 1 if temp > TEMP_CRIT else 0
         
-    if heart_rate < HR_MIN:
+    # heart_rate es 0 mientras no hay pulso detectado
+    if 0 < heart_rate < HR_MIN:
         alerts.append(f"¡ALERTA! Ritmo cardíaco bajo: {heart_rate} BPM")
+        alarms['hr'] = 1 if heart_rate < HR_CRIT_MIN else 0
     elif heart_rate > HR_MAX:
         alerts.append(f"¡ALERTA! Ritmo cardíaco alto: {heart_rate} BPM")
+        alarms['hr'] = 1 if heart_rate > HR_CRIT_MAX else 0
         
     if spo2 < SPO2_MIN:
         alerts.append(f"¡ALERTA! SpO2 bajo: {spo2}%")
-    
-    # Si hay alertas y ha pasado suficiente tiempo desde el último correo
-    if alerts and (current_time - last_email_time >= EMAIL_INTERVAL):
-        print(f"Se detectaron alertas, enviando correo: {alerts}")
+        alarms['spo2'] = 1 if spo2 < SPO2_CRIT else 0
+        
+    return alerts, alarms
+
+# Envía el correo y libera email_busy (corre en otro hilo)
+def email_thread(temp, heart_rate, spo2, alerts):
+    global last_email_time, email_busy
+    try:
         if enviar_alerta_email(temp, heart_rate, spo2, alerts):
-            last_email_time = current_time
+            last_email_time = time.time()
             print(f"Correo enviado. Próximo correo disponible en {EMAIL_INTERVAL} segundos")
-        
-    return alerts
+    finally:
+        email_busy = False
+
+# Tarea: despacha las alertas por correo sin bloquear las demás tareas
+async def alert_dispatcher(cola, stats):
+    global email_busy
+    while True:
+        temp, heart_rate, spo2, alerts = await cola.get()
+        start = time.ticks_us()
+        # Si hay alertas y ha pasado suficiente tiempo desde el último correo
+        if not email_busy and time.time() - last_email_time >= EMAIL_INTERVAL:
+            print(f"Se detectaron alertas, enviando correo: {alerts}")
+            email_busy = True
+            if _thread:
+                # urequests.post bloquea varios segundos: va en otro hilo
+                _thread.stack_size(EMAIL_STACK)
+                _thread.start_new_thread(email_thread, (temp, heart_rate, spo2, alerts))
+            else:
+                email_thread(temp, heart_rate, spo2, alerts)
+        stats.end(start)
 
-# Función para mostrar datos en la pantalla OLED
-def update_display(oled, temp, heart_rate, spo2, alerts=None):
-    if oled:
+# Función para mostrar datos en la pantalla (OLED o cualquier DisplayBackend)
+def update_display(vista, temp, heart_rate, spo2, alerts=None):
+    if vista:
         try:
-            oled.fill(0)  # Limpiar pantalla
-            
-            # Mostrar valores
-            oled.text("Temp: {:.1f} C".format(temp), 0, 0)
-            oled.text("HR: {} BPM".format(heart_rate), 0, 16)
-            oled.text("SpO2: {}%*".format(spo2), 0, 32)  # Asterisco para indicar valor simulado
+            # Solo se redibujan las líneas cuyo texto cambió
+            vista.set(0, "Temp: {:.1f} C".format(temp))
+            vista.set(1, "HR: {} BPM".format(heart_rate or "--"))
+            vista.set(2, "SpO2: {}%*".format(spo2))  # Asterisco para indicar valor simulado
             
             # Mostrar alerta (si hay)
             if alerts and len(alerts) > 0:
-                oled.text("ALERTA!", 0, 48)
+                vista.set(3, "ALERTA!")
             else:
-                oled.text("*valor simulado", 0, 48)  # Indicar que SpO2 es simulado
+                vista.set(3, "*valor simulado")  # Indicar que SpO2 es simulado
                 
-            oled.show()
+            vista.show()
         except Exception as e:
             print("Error al actualizar display:", e)
 
-# Función mejorada para procesar datos del sensor KY-039
-def process_ky039(ky039_sensor):
-    global pulse_readings, last_beat, beat_interval
-    
+# Consume los bloques de muestras pendientes del KY-039
+def process_ky039(sampler):
     try:
-        # Leer el valor analógico del sensor
-        value = ky039_sensor.read()
-        print(f"KY-039 raw: {value}")
-        
-        # Añadir a las lecturas
-        pulse_readings.append(value)
-        
-        # Limitar el número de lecturas almacenadas
-        if len(pulse_readings) > MAX_SAMPLES:
-            pulse_readings.pop(0)
-            
-        if len(pulse_readings) < 20:
-            return 75
-        
-        # Trabajar con las últimas 20 muestras
-        recent_readings = pulse_readings[-20:]
-        min_value = min(recent_readings)
-        max_value = max(recent_readings)
-        
-        # Calcular la derivada (tasa de cambio)
-        derivatives = []
-        for i in range(1, len(recent_readings)):
-            derivatives.append(recent_readings[i] - recent_readings[i-1])
-        
-        # Buscar picos en la derivada (cambios rápidos)
-        current_time = time.time() * 1000
-        
-        # Detectar un pico cuando hay un cambio grande
-        if len(derivatives) > 2 and abs(derivatives[-1]) > 50:
-            # Asegurarse de que no detectamos el mismo latido dos veces
-            if last_beat == 0 or (current_time - last_beat) > 300:  # Al menos 300ms entre latidos
-                print(f"¡Cambio detectado! Derivada: {derivatives[-1]}")
-                
-                if last_beat == 0:
-                    last_beat = current_time
-                    return 75
-                
-                beat_interval = current_time - last_beat
-                last_beat = current_time
-                
-                if 300 < beat_interval < 1500:
-                    bpm = int(60000 / beat_interval)
-                    print(f"Pulso calculado: {bpm} BPM (intervalo: {beat_interval}ms)")
-                    return bpm
-        
-        # Reset si no hay latidos en 3 segundos
-        if last_beat > 0 and (current_time - last_beat) > 3000:
-            print("Sin latidos detectados en 3s, reiniciando")
-            last_beat = 0
-            return 75
-            
-        # Usar último cálculo válido
-        if beat_interval > 300 and beat_interval < 1500:
-            return int(60000 / beat_interval)
-            
-        return 75
+        # El Timer muestrea a ritmo fijo; aquí solo se procesa lo acumulado
+        n = sampler.read_block(block_values, block_times)
+        while n:
+            pulse_detector.process_block(block_values, block_times, n)
+            n = sampler.read_block(block_values, block_times)
+        return pulse_detector.bpm
             
     except Exception as e:
         print(f"Error procesando KY-039: {e}")
-        return 75
+        return 0
 
 # Simular SpO2 basado en ritmo cardíaco y temperatura
 def simulate_spo2(heart_rate, temp):
@@ -302,7 +312,7 @@ def simulate_spo2(heart_rate, temp):
     base_spo2 = 98
     
     # Ajustar según HR (simplificado para demostración)
-    if heart_rate < 60:  # Bradycardia
+    if 0 < heart_rate < 60:  # Bradycardia
         base_spo2 -= 2
     elif heart_rate > 100:  # Tachycardia
         base_spo2 -= 1
@@ -316,8 +326,80 @@ def simulate_spo2(heart_rate, temp):
     # Asegurar que el valor esté dentro de límites razonables
     return max(min(base_spo2, 100), 85)
 
-# Función principal
-def main():
+# Tarea: temperatura
+def poll_temperature(mlx, cola_lecturas):
+    temp = mlx.read_object_temp()
+    cola_lecturas.put_nowait(('temp', temp))
+    print(f"Temperatura: {temp:.1f}°C")
+
+# Tarea: procesa el pulso acumulado por el Timer; avisa solo si cambió
+def poll_pulse(sampler, cola_lecturas):
+    global last_heart_rate
+    heart_rate = process_ky039(sampler)
+    if heart_rate != last_heart_rate:
+        last_heart_rate = heart_rate
+        print(f"Ritmo cardíaco: {heart_rate} BPM (calidad {pulse_detector.quality}%, "
+              f"perfusión {pulse_detector.perfusion / 10:.1f}%)")
+        cola_lecturas.put_nowait(('hr', heart_rate))
+
+# Tarea: con cada lectura revisa umbrales, actualiza las alarmas y
+# reparte el estado a las demás tareas
+async def monitor(cola_lecturas, colas_estado, cola_alertas, alarm_engine,
+                  stats):
+    temp = 0.0
+    heart_rate = 0
+    while True:
+        kind, value = await cola_lecturas.get()
+        start = time.ticks_us()
+        if kind == 'temp':
+            temp = value
+        else:
+            heart_rate = value
+        # Simular SpO2 basado en ritmo cardíaco y temperatura
+        spo2 = simulate_spo2(heart_rate, temp)
+        alerts, alarms = check_values(temp, heart_rate, spo2)
+        # Regresa de inmediato; el patrón lo toca la tarea del motor
+        alarm_engine.update(alarms)
+        estado = (temp, heart_rate, spo2, alerts)
+        for cola in colas_estado:
+            cola.put_nowait(estado)
+        if alerts:
+            print("ALERTAS DETECTADAS:")
+            for alert in alerts:
+                print(alert)
+            cola_alertas.put_nowait(estado)
+        stats.end(start)
+
+# Tarea: redibuja la pantalla si llegó un estado nuevo
+def refresh_display(vista, cola_pantalla):
+    estado = cola_pantalla.latest()
+    if estado is not None:
+        update_display(vista, *estado)
+
+# Tarea: publica en MQTT el estado más reciente
+def publish(mqtt_client, cola_mqtt):
+    global last_published
+    estado = cola_mqtt.latest()
+    if estado is not None:
+        last_published = estado
+    if last_published is None:
+        return  # Aún no hay lecturas
+    temp, heart_rate, spo2, alerts = last_published
+    # Datos simplificados para evitar problemas de serialización
+    data = {
+        "temperatura": round(temp, 1),
+        "ritmo_cardiaco": int(heart_rate),
+        "spo2": int(spo2),  # Valor simulado
+        "alertas": ", ".join(alerts) if alerts else "",
+        "timestamp": int(time.time())
+    }
+    # Convertir a JSON
+    json_data = json.dumps(data)
+    mqtt_client.publish(MQTT_TOPIC, json_data.encode())  # Codificar como bytes
+    print(f"Datos enviados a MQTT: {json_data}")
+
+# Arranca las tareas; cada una corre con su propio periodo
+async def run():
     # Iniciar con limpieza de memoria
     gc.collect()
     
@@ -326,6 +408,14 @@ def main():
     
     # Inicializar componentes
     oled, ky039, mlx, buzzer = init_components()
+    # Líneas de texto de la pantalla: 4 renglones a 16 píxeles
+    vista = TextLines(oled, 4) if oled else None
+    
+    # Muestreo del KY-039 a ritmo fijo con un Timer de hardware
+    sampler = None
+    if ky039:
+        sampler = PulseSampler(ky039, SAMPLE_RATE)
+        sampler.start(Timer(KY039_TIMER))
     
     # Conectar a WiFi
     wifi_connected = connect_wifi()
@@ -335,84 +425,53 @@ def main():
     if wifi_connected:
         mqtt_client = setup_mqtt()
     
-    # Inicializar variables para lecturas
-    temp = 0.0
-    heart_rate = 75  # Valor inicial
-    spo2 = 97        # Valor inicial (simulado)
-    last_mqtt_time = 0
+    # Colas entre tareas: lecturas de los sensores al monitor, y del
+    # monitor a la pantalla, MQTT y el envío de correos
+    cola_lecturas = Queue(8)
+    cola_pantalla = Queue(1)
+    cola_mqtt = Queue(1)
+    cola_alertas = Queue(4)
+    # Buzzer y LED de alerta con patrones por prioridad
+    alarm_engine = init_alarms(buzzer)
     
     print("Iniciando monitoreo...")
     
-    # Bucle principal
-    while True:
-        try:
-            # Recolectar basura para evitar problemas de memoria
-            gc.collect()
-            
-            # Obtener tiempo actual
-            current_time = time.time()
-            
-            # Leer temperatura
-            if mlx:
-                try:
-                    temp = mlx.read_object_temp()
-                    print(f"Temperatura: {temp:.1f}°C")
-                except Exception as e:
-                    print("Error al leer temperatura:", e)
-            
-            # Leer pulso del sensor KY-039
-            if ky039:
-                try:
-                    heart_rate = process_ky039(ky039)
-                    print(f"Ritmo cardíaco: {heart_rate} BPM")
-                    
-                    # Simular SpO2 basado en ritmo cardíaco y temperatura
-                    spo2 = simulate_spo2(heart_rate, temp)
-                    print(f"SpO2 (simulado): {spo2}%")
-                except Exception as e:
-                    print("Error al obtener datos KY-039:", e)
-            
-            # Verificar valores y enviar alerta si es necesario
-            alerts = check_values(temp, heart_rate, spo2)
-            
-            # Activar alarma si hay alertas
-            if alerts:
-                print("ALERTAS DETECTADAS:")
-                for alert in alerts:
-                    print(alert)
-                sound_alarm(buzzer, 1)  # Duración más corta para reducir bloqueos
-            
-            # Actualizar pantalla
-            update_display(oled, temp, heart_rate, spo2, alerts)
-            
-            # Enviar datos a MQTT cada 5 segundos
-            if mqtt_client and (current_time - last_mqtt_time >= 5):
-                try:
-                    # Datos simplificados para evitar problemas de serialización
-                    data = {
-                        "temperatura": round(temp, 1),
-                        "ritmo_cardiaco": int(heart_rate),
-                        "spo2": int(spo2),  # Valor simulado
-                        "alertas": ", ".join(alerts) if alerts else "",
-                        "timestamp": int(current_time)
-                    }
-                    # Convertir a JSON con manejo de errores
-                    json_data = json.dumps(data)
-                    mqtt_client.publish(MQTT_TOPIC, json_data.encode())  # Codificar como bytes
-                    print(f"Datos enviados a MQTT: {json_data}")
-                    last_mqtt_time = current_time
-                except Exception as e:
-                    print(f"Error al publicar en MQTT: {e}")
-            
-            # Esperar - tiempo más corto para muestreo frecuente del sensor KY-039
-            time.sleep(0.1)  # Muestreo más frecuente para detectar mejor los pulsos
-            
-        except KeyboardInterrupt:
-            print("Programa terminado por el usuario")
-            break
-        except Exception as e:
-            print("Error en bucle principal:", e)
-            time.sleep(3)  # Esperar más tiempo antes de reintentar
+    stats = []
+    def start(stats_task, coro):
+        stats.append(stats_task)
+        asyncio.create_task(coro)
+    def every(name, period, func):
+        task_stats = TaskStats(name, period)
+        start(task_stats, periodic(task_stats, func))
+    
+    if mlx:
+        every('temp', TEMP_PERIOD, lambda: poll_temperature(mlx, cola_lecturas))
+    if sampler:
+        every('pulso', DSP_PERIOD, lambda: poll_pulse(sampler, cola_lecturas))
+    monitor_stats = TaskStats('monitor')
+    start(monitor_stats, monitor(cola_lecturas, (cola_pantalla, cola_mqtt),
+                                 cola_alertas, alarm_engine, monitor_stats))
+    every('gc', GC_PERIOD, gc.collect)
+    every('pantalla', UI_PERIOD, lambda: refresh_display(vista, cola_pantalla))
+    if mqtt_client:
+        every('mqtt', MQTT_PERIOD, lambda: publish(mqtt_client, cola_mqtt))
+    email_stats = TaskStats('correo')
+    start(email_stats, alert_dispatcher(cola_alertas, email_stats))
+    asyncio.create_task(alarm_engine.run())
+    
+    try:
+        await report(stats, STATS_PERIOD)
+    finally:
+        if sampler:
+            sampler.stop()
+        alarm_engine.output(False)
+
+# Función principal
+def main():
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("Programa terminado por el usuario")
 
 # Punto de entrada principal con protección global
 if __name__ == "__main__":
@@ -28,9 +28,8 @@ def mostrar_imagen_raw(archivo, x, y, ancho, alto):
             print(f"Error: Tamaño de imagen incorrecto. Esperado: {tamaño_esperado}, Actual: {tamaño_real}")
             return False
         
-        # Leer y mostrar la imagen
-        with open(archivo, 'rb') as f:
-            display.block(x, y, x + ancho - 1, y + alto - 1, f.read())
+        # Mostrar la imagen por bloques sin cargar todo el archivo en RAM
+        display.draw_image(archivo, x, y, ancho, alto)
         return True
         
     except Exception as e:
@@ -0,0 +1,130 @@
+"""
+Motor de alarmas no bloqueante para el buzzer y el LED de alerta.
+
+Cada alarma se declara con un patrón: prioridad, frecuencia del buzzer,
+duraciones alternando encendido/apagado y la pausa entre repeticiones.
+El número de destellos del patrón sirve de código en el LED. start() y
+stop() regresan de inmediato; la tarea run() toca el patrón de la alarma
+activa de mayor prioridad y lo interrumpe en cuanto otra la desplaza.
+"""
+try:
+    import uasyncio as asyncio
+    wait_for_ms = asyncio.wait_for_ms
+except ImportError:  # asyncio de CPython no tiene wait_for_ms
+    import asyncio
+
+    def wait_for_ms(aw, ms):
+        return asyncio.wait_for(aw, ms / 1000)
+
+
+class AlarmEngine(object):
+    """Toca patrones de alarma con prioridad y sin bloquear."""
+
+    def __init__(self, buzzer=None, led=None, volume=512):
+        """Inicializa el motor.
+
+        Args:
+            buzzer (Class PWM): Buzzer pasivo, o None.
+            led (Class Pin): LED de alerta, o None.
+            volume (int): Duty del PWM mientras suena.
+        """
+        self.buzzer = buzzer
+        self.led = led
+        self.volume = volume
+        self.patterns = {}
+        self.active = {}  # Alarma -> severidad
+        self.current = None  # Alarma que se está tocando
+        self.changed = asyncio.Event()
+
+    def define(self, name, priority, steps, freq=2000, pause=2000):
+        """Declara el patrón de una alarma.
+
+        Args:
+            name (str): Nombre de la alarma.
+            priority (int): Mayor número desplaza a las demás.
+            steps (tuple): ms encendido, ms apagado, ... de una repetición.
+            freq (int): Frecuencia del buzzer en Hz.
+            pause (int): ms de silencio entre repeticiones con severidad
+                0; cada nivel de severidad la divide.
+        """
+        self.patterns[name] = (priority, freq, steps, pause)
+
+    def output(self, on):
+        # Enciende o apaga el buzzer y el LED juntos
+        if self.buzzer:
+            self.buzzer.duty(self.volume if on else 0)
+        if self.led:
+            self.led.value(1 if on else 0)
+
+    async def run(self):
+        """Tarea que toca la alarma actual; no termina."""
+        while True:
+            self.changed.clear()
+            name = self.current
+            if name is None:
+                self.output(False)
+                await self.changed.wait()
+                continue
+            priority, freq, steps, pause = self.patterns[name]
+            if self.buzzer:
+                self.buzzer.freq(freq)
+            preempted = False
+            for i in range(len(steps)):
+                self.output(not i & 1)
+                if await self.wait(steps[i]):
+                    preempted = True
+                    break
+            if not preempted:
+                self.output(False)
+                await self.wait(pause // (1 + self.active.get(name, 0)))
+
+    def select(self):
+        # La alarma activa de mayor prioridad; avisa a run() si cambió
+        best = None
+        for name in self.active:
+            if best is None or self.patterns[name][0] > self.patterns[best][0]:
+                best = name
+        if best != self.current:
+            self.current = best
+            self.changed.set()
+
+    def start(self, name, severity=0):
+        """Activa una alarma; regresa de inmediato.
+
+        Args:
+            name (str): Alarma declarada con define().
+            severity (int): Acorta la pausa entre repeticiones.
+        """
+        if name not in self.patterns:
+            raise ValueError('Alarma no definida: ' + name)
+        self.active[name] = severity
+        self.select()
+
+    def stop(self, name=None):
+        """Desactiva una alarma, o todas si name es None."""
+        if name is None:
+            self.active.clear()
+        else:
+            self.active.pop(name, None)
+        self.select()
+
+    def update(self, alarms):
+        """Deja activas exactamente las alarmas dadas.
+
+        Args:
+            alarms (dict): Alarma -> severidad.
+        """
+        for name in list(self.active):
+            if name not in alarms:
+                del self.active[name]
+        for name in alarms:
+            self.start(name, alarms[name])
+        self.select()
+
+    async def wait(self, ms):
+        # Espera ms o hasta que cambie la alarma actual (regresa True)
+        try:
+            await wait_for_ms(self.changed.wait(), ms)
+            return True
+        except asyncio.TimeoutError:
+            return False
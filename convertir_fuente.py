@@ -0,0 +1,70 @@
+"""
+Convierte una fuente X-GLCD (texto con arreglos hex estilo C) al formato
+binario que carga XglcdFont de un solo golpe.
+
+Formato (todos los campos de 1 byte):
+    'XGF1' | ancho | alto | primera letra | número de letras
+    tabla de anchos (1 byte por letra)
+    tabla de glifos (bytes_por_letra por letra, mismo orden que X-GLCD)
+
+Uso en la PC:
+    python convertir_fuente.py fuente.c fuente.bin 8 16 [32] [96]
+"""
+
+import sys
+from math import floor
+
+MAGIC = b'XGF1'
+
+
+def bytes_por_letra(ancho, alto):
+    alto = max(alto, 8)
+    return (floor((alto - 1) / 8) + 1) * ancho + 1
+
+
+def leer_xglcd(archivo, ancho, alto, numero_letras=96):
+    """Lee la fuente X-GLCD y regresa la tabla de glifos empaquetada"""
+    tam = bytes_por_letra(ancho, alto)
+    glifos = bytearray(tam * numero_letras)
+    offset = 0
+    with open(archivo, 'r') as f:
+        for linea in f:
+            linea = linea.strip()
+            if len(linea) == 0 or linea[0:2] != '0x':
+                continue
+            comentario = linea.find('//')
+            if comentario != -1:
+                linea = linea[0:comentario].strip()
+            if linea.endswith(','):
+                linea = linea[0:len(linea) - 1]
+            glifos[offset:offset + tam] = bytearray(
+                int(b, 16) for b in linea.split(','))
+            offset += tam
+    return glifos
+
+
+def convertir(origen, destino, ancho, alto, primera_letra=32,
+              numero_letras=96):
+    """Escribe la fuente en formato binario"""
+    if not (0 < ancho < 256 and 0 < alto < 256 and
+            0 <= primera_letra < 256 and 0 < numero_letras < 256):
+        raise ValueError('Los campos de la cabecera deben caber en un byte')
+    glifos = leer_xglcd(origen, ancho, alto, numero_letras)
+    tam = bytes_por_letra(ancho, alto)
+    anchos = bytearray(glifos[i * tam] for i in range(numero_letras))
+    with open(destino, 'wb') as f:
+        f.write(MAGIC)
+        f.write(bytearray([ancho, alto, primera_letra, numero_letras]))
+        f.write(anchos)
+        f.write(glifos)
+    return len(MAGIC) + 4 + len(anchos) + len(glifos)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 5:
+        print('Uso: python convertir_fuente.py origen destino ancho alto '
+              '[primera_letra] [numero_letras]')
+        sys.exit(1)
+    args = [int(a) for a in sys.argv[3:]]
+    total = convertir(sys.argv[1], sys.argv[2], *args)
+    print(f'Fuente convertida: {sys.argv[2]} ({total} bytes)')
@@ -0,0 +1,100 @@
+"""
+Comprime imágenes .raw RGB565 (big-endian, como las que usa
+Display.draw_image) al formato que dibuja Display.draw_packed_image.
+
+Formatos:
+    RL16: corridas (largo - 1, color msb, color lsb), hasta 256 píxeles
+    PAL4: paleta de hasta 16 colores, 4 bits por píxel
+    PAL8: paleta de hasta 256 colores, 8 bits por píxel
+
+Cabecera: etiqueta de 4 bytes, ancho y alto en 16 bits big-endian.
+Las paletas llevan además el número de colores (16 bits) y los colores.
+
+Uso en la PC:
+    python convertir_imagen.py imagen.raw imagen.img 128 128 [formato]
+    (formato: RL16, PAL4, PAL8 o auto para elegir el más pequeño)
+"""
+
+import sys
+
+
+def leer_raw(archivo, ancho, alto):
+    """Regresa la lista de colores RGB565 de la imagen"""
+    with open(archivo, 'rb') as f:
+        datos = f.read()
+    if len(datos) != ancho * alto * 2:
+        raise ValueError(f'Tamaño incorrecto: esperado {ancho * alto * 2}, '
+                         f'actual {len(datos)}')
+    return [datos[i] << 8 | datos[i + 1] for i in range(0, len(datos), 2)]
+
+
+def cabecera(etiqueta, ancho, alto):
+    return etiqueta + bytes([ancho >> 8, ancho & 0xff, alto >> 8, alto & 0xff])
+
+
+def codificar_rle(pixeles, ancho, alto):
+    salida = bytearray(cabecera(b'RL16', ancho, alto))
+    i = 0
+    total = len(pixeles)
+    while i < total:
+        color = pixeles[i]
+        largo = 1
+        while i + largo < total and largo < 256 and pixeles[i + largo] == color:
+            largo += 1
+        salida += bytes([largo - 1, color >> 8, color & 0xff])
+        i += largo
+    return bytes(salida)
+
+
+def codificar_paleta(pixeles, ancho, alto, bits):
+    paleta = sorted(set(pixeles))
+    if len(paleta) > (1 << bits):
+        return None  # Demasiados colores para este formato
+    indice = {color: i for i, color in enumerate(paleta)}
+    salida = bytearray(cabecera(b'PAL4' if bits == 4 else b'PAL8', ancho, alto))
+    salida += bytes([len(paleta) >> 8, len(paleta) & 0xff])
+    for color in paleta:
+        salida += bytes([color >> 8, color & 0xff])
+    for y in range(alto):
+        fila = pixeles[y * ancho:(y + 1) * ancho]
+        if bits == 8:
+            salida += bytes(indice[c] for c in fila)
+        else:
+            # Dos píxeles por byte, nibble alto primero; filas completas
+            for x in range(0, ancho, 2):
+                alto_nib = indice[fila[x]]
+                bajo_nib = indice[fila[x + 1]] if x + 1 < ancho else 0
+                salida.append(alto_nib << 4 | bajo_nib)
+    return bytes(salida)
+
+
+def convertir(origen, destino, ancho, alto, formato='auto'):
+    """Escribe la imagen comprimida y regresa (formato, bytes)"""
+    pixeles = leer_raw(origen, ancho, alto)
+    candidatos = {}
+    if formato in ('auto', 'RL16'):
+        candidatos['RL16'] = codificar_rle(pixeles, ancho, alto)
+    for bits in (4, 8):
+        nombre = 'PAL%d' % bits
+        if formato in ('auto', nombre):
+            datos = codificar_paleta(pixeles, ancho, alto, bits)
+            if datos is not None:
+                candidatos[nombre] = datos
+    if not candidatos:
+        raise ValueError(f'La imagen no se puede codificar como {formato}')
+    nombre = min(candidatos, key=lambda k: len(candidatos[k]))
+    with open(destino, 'wb') as f:
+        f.write(candidatos[nombre])
+    return nombre, len(candidatos[nombre])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 5:
+        print('Uso: python convertir_imagen.py origen destino ancho alto '
+              '[RL16|PAL4|PAL8|auto]')
+        sys.exit(1)
+    ancho, alto = int(sys.argv[3]), int(sys.argv[4])
+    formato = sys.argv[5] if len(sys.argv) > 5 else 'auto'
+    nombre, total = convertir(sys.argv[1], sys.argv[2], ancho, alto, formato)
+    print(f'{sys.argv[2]}: {nombre}, {total} bytes '
+          f'(raw: {ancho * alto * 2} bytes)')
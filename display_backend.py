@@ -0,0 +1,205 @@
+"""Display backend interface shared by the display drivers."""
+from framebuf import FrameBuffer, RGB565  # type: ignore
+from micropython import const  # type: ignore
+
+
+class DisplayBackend(object):
+    """Common interface of the display drivers.
+
+    A backend writes windows of pixels in its native format with block(),
+    pushes pending changes with flush() and tracks the changed regions in
+    dirty.  Renderers written against this interface work on any panel.
+
+    Subclasses provide width, height, dirty, block() and flush() and set
+    FORMAT to the framebuf format of block() data.
+    """
+
+    DIRTY_MAX = const(8)  # Dirty rectangles tracked before forced merging
+    FORMAT = RGB565  # framebuf format of block() data
+
+    def block(self, x0, y0, x1, y1, data):
+        """Write a window of pixels.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            data (bytes): Pixels in the backend FORMAT.
+        """
+        raise NotImplementedError
+
+    def buffer_size(self, w, h):
+        """Return the bytes of a w x h block in the backend FORMAT."""
+        return w * h * 2
+
+    def capabilities(self):
+        """Return what the panel supports.
+
+        Returns:
+            dict: width, height, format (framebuf format of block data),
+            color (bool) and partial (True if flush() only sends the
+            dirty regions).
+        """
+        return {'width': self.width, 'height': self.height,
+                'format': self.FORMAT, 'color': self.FORMAT == RGB565,
+                'partial': True}
+
+    def dirty_region(self):
+        """Return the bounding box (x0, y0, x1, y1) of the pending
+        changes, or None."""
+        if not self.dirty:
+            return None
+        x0, y0, x1, y1 = self.dirty[0]
+        for r in self.dirty:
+            x0 = min(x0, r[0])
+            y0 = min(y0, r[1])
+            x1 = max(x1, r[2])
+            y1 = max(y1, r[3])
+        return x0, y0, x1, y1
+
+    def flush(self):
+        """Push pending changes to the panel."""
+        raise NotImplementedError
+
+    def mark_dirty(self, x0, y0, x1, y1):
+        """Add a region to the dirty rectangles pending flush.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+        Note:
+            Overlapping or adjacent rectangles are merged.  Once DIRTY_MAX
+            rectangles are tracked, the new region is merged with the one
+            whose bounding box grows the least.
+        """
+        dirty = self.dirty
+        i = 0
+        while i < len(dirty):
+            r = dirty[i]
+            if (x0 <= r[2] + 1 and r[0] <= x1 + 1 and
+                    y0 <= r[3] + 1 and r[1] <= y1 + 1):
+                x0 = min(x0, r[0])
+                y0 = min(y0, r[1])
+                x1 = max(x1, r[2])
+                y1 = max(y1, r[3])
+                dirty.pop(i)
+                i = 0
+            else:
+                i += 1
+        if len(dirty) >= self.DIRTY_MAX:
+            best = 0
+            best_cost = None
+            for i, r in enumerate(dirty):
+                cost = ((max(x1, r[2]) - min(x0, r[0]) + 1) *
+                        (max(y1, r[3]) - min(y0, r[1]) + 1) -
+                        (r[2] - r[0] + 1) * (r[3] - r[1] + 1))
+                if best_cost is None or cost < best_cost:
+                    best = i
+                    best_cost = cost
+            r = dirty.pop(best)
+            self.mark_dirty(min(x0, r[0]), min(y0, r[1]),
+                            max(x1, r[2]), max(y1, r[3]))
+            return
+        dirty.append([x0, y0, x1, y1])
+
+    def native_color(self, color):
+        """Return the framebuf color value of an RGB565 color.
+
+        Note:
+            framebuf stores RGB565 little-endian while the panels take
+            big-endian pixels, so the bytes are swapped.
+        """
+        return (color & 0xff) << 8 | color >> 8
+
+
+class MemoryBackend(DisplayBackend):
+    """In-memory RGB565 backend for running renderers on a host.
+
+    flush() only accounts for the bytes a panel would receive, so the
+    cost of a renderer can be measured with the MicroPython unix port.
+    """
+
+    def __init__(self, width, height):
+        """Initialize memory backend.
+
+        Args:
+            width (int): Width in pixels.
+            height (int): Height in pixels.
+        """
+        self.width = width
+        self.height = height
+        self.framebuffer = bytearray(width * height * 2)
+        self.fbuf = FrameBuffer(self.framebuffer, width, height, RGB565)
+        self.dirty = []
+        self.blocks_written = 0  # Dirty rectangles flushed
+        self.bytes_written = 0  # Pixel bytes flushed
+
+    def block(self, x0, y0, x1, y1, data):
+        src = FrameBuffer(data, x1 - x0 + 1, y1 - y0 + 1, RGB565)
+        self.fbuf.blit(src, x0, y0)
+        self.mark_dirty(x0, y0, x1, y1)
+
+    def flush(self):
+        for x0, y0, x1, y1 in self.dirty:
+            self.blocks_written += 1
+            self.bytes_written += (x1 - x0 + 1) * (y1 - y0 + 1) * 2
+        self.dirty = []
+
+    def pixel(self, x, y):
+        """Return the RGB565 color of a pixel."""
+        i = (y * self.width + x) * 2
+        return self.framebuffer[i] << 8 | self.framebuffer[i + 1]
+
+
+class TextLines(object):
+    """Lines of 8x8 text redrawn only when their text changes.
+
+    Each changed line is rendered off-screen in the backend format and
+    written with a single block(), so a screen of readings costs one
+    small block per changed value on any backend.
+    """
+
+    def __init__(self, backend, count, x=0, y=0, chars=16, pitch=16,
+                 color=0xffff, background=0):
+        """Initialize text lines.
+
+        Args:
+            backend (DisplayBackend): Target display.
+            count (int): Number of lines.
+            x (int): Left position.
+            y (int): Top of the first line.
+            chars (int): Characters per line (shorter text is padded).
+            pitch (int): Pixels between line tops.
+            color (int): RGB565 text color.
+            background (int): RGB565 background color.
+        """
+        self.backend = backend
+        self.x = x
+        self.y = y
+        self.chars = chars
+        self.pitch = pitch
+        self.color = backend.native_color(color)
+        self.background = backend.native_color(background)
+        self.lines = [None] * count  # Text on the display
+        w = chars * 8
+        self.buf = bytearray(backend.buffer_size(w, 8))
+        self.fbuf = FrameBuffer(self.buf, w, 8, backend.FORMAT)
+
+    def set(self, i, text):
+        """Change the text of line i; redraws it only if it changed."""
+        text = text[:self.chars]
+        if text == self.lines[i]:
+            return
+        self.lines[i] = text
+        self.fbuf.fill(self.background)
+        self.fbuf.text(text, 0, 0, self.color)
+        y = self.y + i * self.pitch
+        self.backend.block(self.x, y, self.x + self.chars * 8 - 1, y + 7,
+                           self.buf)
+
+    def show(self):
+        """Push the changed lines to the panel."""
+        self.backend.flush()
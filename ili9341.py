@@ -2,8 +2,16 @@
 from time import sleep
 from math import cos, sin, pi, radians
 from sys import implementation
+from array import array
+import gc
 from framebuf import FrameBuffer, RGB565  # type: ignore
 from micropython import const  # type: ignore
+from display_backend import DisplayBackend
+try:
+    from ili9341_viper import reverse565_into, rotate565_into
+except (ImportError, SyntaxError, AttributeError, NameError):
+    # No native emitters (or not MicroPython): plain Python fallbacks
+    reverse565_into = rotate565_into = None
 
 
 def color565(r, g, b):
@@ -17,7 +25,91 @@ def color565(r, g, b):
     return (r & 0xf8) << 8 | (g & 0xfc) << 3 | b >> 3
 
 
-class Display(object):
+def fill565(buf, color, start=0, end=None):
+    """Fill part of an RGB565 buffer with a color without allocating.
+
+    Args:
+        buf (bytearray): Buffer to fill.
+        color (int): RGB565 color value.
+        start (Optional int): First byte to fill (default 0).
+        end (Optional int): End byte (default: end of buffer).
+    """
+    mv = memoryview(buf)
+    if end is None:
+        end = len(mv)
+    if end - start < 2:
+        return
+    mv[start] = color >> 8
+    mv[start + 1] = color & 0xff
+    n = 2
+    total = end - start
+    # Double the filled region on each copy
+    while n < total:
+        k = min(n, total - n)
+        mv[start + n:start + n + k] = mv[start:start + k]
+        n += k
+
+
+def reverse565(buf):
+    """Return a copy of an RGB565 buffer with the pixel order reversed.
+
+    Args:
+        buf (bytes): RGB565 buffer.
+    Note:
+        Reversing the pixel order rotates an image by 180 degrees.
+    """
+    size = len(buf) & ~1
+    new_buf = bytearray(size)
+    if reverse565_into is not None:
+        reverse565_into(buf, new_buf, size >> 1)
+        return new_buf
+    j = size - 2
+    for i in range(0, size, 2):
+        new_buf[j] = buf[i]
+        new_buf[j + 1] = buf[i + 1]
+        j -= 2
+    return new_buf
+
+
+def rotate565(buf, w, h, rotate):
+    """Return an RGB565 image rotated clockwise.
+
+    Args:
+        buf (bytes): RGB565 buffer, w x h pixels.
+        w (int): Width of image.
+        h (int): Height of image.
+        rotate (int): 0, 90, 180 or 270 degrees.
+    Returns:
+        tuple(buffer, int, int): Rotated buffer, width and height.
+    """
+    if rotate == 0:
+        return buf, w, h
+    if rotate == 180:
+        return reverse565(buf), w, h
+    if rotate not in (90, 270):
+        raise ValueError('Rotation must be 0, 90, 180 or 270.')
+    out = bytearray(w * h * 2)
+    if rotate565_into is not None:
+        rotate565_into(buf, out, w, h, rotate)
+        return out, h, w
+    row = h * 2  # Bytes per destination row
+    for y in range(h):
+        s = y * w * 2
+        if rotate == 90:
+            d = (h - 1 - y) * 2
+            step = row
+        else:
+            d = (w - 1) * row + y * 2
+            step = -row
+        for _ in range(w):
+            out[d] = buf[s]
+            out[d + 1] = buf[s + 1]
+            s += 2
+            d += step
+    return out, h, w
+
+
+class Display(DisplayBackend):
     """Serial interface for 16-bit color (5-6-5 RGB) IL9341 display.
 
     Note:  All coordinates are zero based.
@@ -93,8 +185,15 @@ class Display(object):
         (True, 270): 0xA0  # 1010 0000
     }
 
+    FLUSH_CHUNK = const(4096)  # Bytes per SPI burst when flushing
+    TEXT_BUFFER_MAX = const(6144)  # Bytes composed per draw_text strip
+    IMAGE_CHUNK_MAX = const(8192)  # Largest image chunk buffer in bytes
+    FILL_CHUNK = const(1024)  # Pixels per pooled solid color buffer
+    FILL_POOL_SIZE = const(4)  # Solid color buffers kept (LRU)
+    ARGS_MAX = const(16)  # Command argument bytes sent without allocating
+
     def __init__(self, spi, cs, dc, rst, width=240, height=320, rotation=0,
-                 mirror=False, bgr=True, gamma=True):
+                 mirror=False, bgr=True, gamma=True, buffered=False):
         """Initialize OLED.
 
         Args:
@@ -108,6 +207,11 @@ class Display(object):
             mirror (Optional bool): Mirror display (default False)
             bgr (Optional bool): Swaps red and blue colors (default True)
             gamma (Optional bool): Custom gamma correction (default True)
+            buffered (Optional bool): Draw into an off-screen RGB565 buffer
+                that is pushed to the display by flush() (default False)
+        Note:
+            The off-screen buffer needs width x height x 2 bytes of RAM
+            (150 KB for 240x320), so buffered mode requires PSRAM.
         """
         self.spi = spi
         self.cs = cs
@@ -115,6 +219,27 @@ class Display(object):
         self.rst = rst
         self.width = width
         self.height = height
+        self.framebuffer = None  # Off-screen buffer (buffered mode only)
+        self.dirty = []  # Dirty rectangles [x0, y0, x1, y1] pending flush
+        self._stage = None  # Staging buffer for non-contiguous flushes
+        self._image_buf = None  # Image chunk buffer (memoryview)
+        self._fills = []  # Pooled [color, memoryview] fills, most recent first
+        # Span table: per-row min/max X (and scratch half widths) of shapes
+        self._span_lo = array('h', bytes(2 * height))
+        self._span_hi = array('h', bytes(2 * height))
+        self._span_ext = array('h', bytes(2 * height))
+        # Preallocated command/argument buffers, with a view per length
+        self._cmd = bytearray(1)
+        self._args = memoryview(bytearray(self.ARGS_MAX))
+        self._arg_views = tuple(self._args[:n]
+                                for n in range(self.ARGS_MAX + 1))
+        self._col = -1  # Cached column window (x0 << 16 | x1)
+        self.clip = (0, 0, width - 1, height - 1)  # Drawable x0, y0, x1, y1
+        self.clipped = 0  # Draws rejected for lying outside the clip
+        self.clip_log = None  # Optional hook(xmin, ymin, xmax, ymax)
+        self.blocks_written = 0  # Blocks sent to display memory
+        self.bytes_written = 0  # Pixel bytes sent to display memory
+        self._page = -1  # Cached page window (y0 << 16 | y1)
         if (mirror, rotation) not in self.MIRROR_ROTATE:
             raise ValueError('Rotation must be 0, 90, 180 or 270.')
         else:
@@ -128,6 +253,7 @@ class Display(object):
             self.dc.switch_to_output(value=False)
             self.rst.switch_to_output(value=True)
             self.reset = self.reset_cpy
+            self.write_block = self.write_block_cpy
             self.write_cmd = self.write_cmd_cpy
             self.write_data = self.write_data_cpy
         else:
@@ -135,6 +261,7 @@ class Display(object):
             self.dc.init(self.dc.OUT, value=0)
             self.rst.init(self.rst.OUT, value=1)
             self.reset = self.reset_mpy
+            self.write_block = self.write_block_mpy
             self.write_cmd = self.write_cmd_mpy
             self.write_data = self.write_data_mpy
         self.reset()
@@ -170,6 +297,143 @@ class Display(object):
         self.write_cmd(self.DISPLAY_ON)  # Display on
         sleep(.1)
         self.clear()
+        if buffered:
+            # Allocated after clear so the black buffer matches the panel
+            self.framebuffer = bytearray(width * height * 2)
+
+    def _decode_palette(self, f, x, y, x2, y2, out, chunk_height, bits):
+        """Expand palette indexed rows into the chunk buffer.
+
+        Returns:
+            bool: False if the file ended before the last row.
+        """
+        count = f.read(2)
+        if len(count) < 2:
+            return False
+        size = (count[0] << 8 | count[1]) * 2
+        palette = f.read(size)
+        if len(palette) < size:
+            return False
+        w = x2 - x + 1
+        row_bytes = w * 2
+        packed = bytearray((w + 1) // 2 if bits == 4 else w)
+        chunk_y = y
+        truncated = False
+        while chunk_y <= y2 and not truncated:
+            rows = min(chunk_height, y2 - chunk_y + 1)
+            pos = 0
+            for _ in range(rows):
+                if f.readinto(packed) != len(packed):
+                    # Truncated file: send the complete rows decoded so far
+                    rows = pos // row_bytes
+                    truncated = True
+                    break
+                if bits == 8:
+                    for p in packed:
+                        p += p
+                        out[pos] = palette[p]
+                        out[pos + 1] = palette[p + 1]
+                        pos += 2
+                else:
+                    end = pos + row_bytes
+                    for p in packed:
+                        hi = (p >> 3) & 0x1e
+                        out[pos] = palette[hi]
+                        out[pos + 1] = palette[hi + 1]
+                        pos += 2
+                        if pos < end:
+                            lo = (p & 0x0f) << 1
+                            out[pos] = palette[lo]
+                            out[pos + 1] = palette[lo + 1]
+                            pos += 2
+            if pos:
+                self.block(x, chunk_y, x2, chunk_y + rows - 1, out[:pos])
+            chunk_y += rows
+        return not truncated
+
+    def _decode_rle(self, f, x, y, x2, y2, out, chunk_height):
+        """Expand RGB565 runs into the chunk buffer.
+
+        Returns:
+            bool: False if the file ended before the last row.
+        """
+        row_bytes = (x2 - x + 1) * 2
+        inbuf = bytearray(3 * 128)
+        n = k = 0
+        run = 0  # Bytes left in the current run
+        color = 0
+        chunk_y = y
+        while chunk_y <= y2:
+            rows = min(chunk_height, y2 - chunk_y + 1)
+            need = rows * row_bytes
+            pos = 0
+            while pos < need:
+                if not run:
+                    if k + 3 > n:
+                        n = f.readinto(inbuf)
+                        k = 0
+                        if n < 3:
+                            break
+                    run = (inbuf[k] + 1) * 2
+                    color = inbuf[k + 1] << 8 | inbuf[k + 2]
+                    k += 3
+                m = min(run, need - pos)
+                fill565(out, color, pos, pos + m)
+                pos += m
+                run -= m
+            if pos < need:
+                # Truncated file: send the complete rows decoded so far
+                rows = pos // row_bytes
+                if rows:
+                    self.block(x, chunk_y, x2, chunk_y + rows - 1,
+                               out[:rows * row_bytes])
+                return False
+            self.block(x, chunk_y, x2, chunk_y + rows - 1, out[:need])
+            chunk_y += rows
+        return True
+
+    def blit_rows(self, x0, y0, x1, y1, src, stride, offset, block):
+        """Send a rectangle of rows taken from a larger RGB565 buffer.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            src (bytes): Source buffer.
+            stride (int): Bytes per row in the source buffer.
+            offset (int): Byte offset of the first pixel in the source.
+            block (function): Block writer receiving (x0, y0, x1, y1, data).
+        Note:
+            Contiguous rows are sent as memoryview slices without copying,
+            otherwise rows are packed into a staging buffer so each SPI
+            burst carries up to FLUSH_CHUNK bytes.
+        """
+        mv = memoryview(src)
+        row_bytes = (x1 - x0 + 1) * 2
+        if row_bytes == stride:
+            rows = max(1, self.FLUSH_CHUNK // stride)
+            y = y0
+            while y <= y1:
+                n = min(rows, y1 - y + 1)
+                block(x0, y, x1, y + n - 1, mv[offset:offset + n * stride])
+                offset += n * stride
+                y += n
+            return
+        if self._stage is None or len(self._stage) < row_bytes:
+            self._stage = bytearray(max(self.FLUSH_CHUNK, row_bytes))
+        stage = memoryview(self._stage)
+        rows = len(stage) // row_bytes
+        y = y0
+        while y <= y1:
+            n = min(rows, y1 - y + 1)
+            pos = 0
+            for _ in range(n):
+                stage[pos:pos + row_bytes] = mv[offset:offset + row_bytes]
+                pos += row_bytes
+                offset += stride
+            block(x0, y, x1, y + n - 1, stage[:pos])
+            y += n
 
     def block(self, x0, y0, x1, y1, data):
         """Write a block of data to display.
@@ -180,21 +444,175 @@ class Display(object):
             x1 (int):  Ending X position.
             y1 (int):  Ending Y position.
             data (bytes): Data buffer to write.
+        Note:
+            In buffered mode the data is copied to the off-screen buffer
+            and the region is marked dirty until the next flush().
+            Blocks crossing the clip rectangle are cropped to it.
         """
-        self.write_cmd(self.SET_COLUMN,
-                       x0 >> 8, x0 & 0xff, x1 >> 8, x1 & 0xff)
-        self.write_cmd(self.SET_PAGE,
-                       y0 >> 8, y0 & 0xff, y1 >> 8, y1 & 0xff)
-        self.write_cmd(self.WRITE_RAM)
-        self.write_data(data)
+        out = (self.write_block if self.framebuffer is None
+               else self.buffer_block)
+        xmin, ymin, xmax, ymax = self.clip
+        if x0 >= xmin and y0 >= ymin and x1 <= xmax and y1 <= ymax:
+            out(x0, y0, x1, y1, data)
+            return
+        cx0 = max(x0, xmin)
+        cy0 = max(y0, ymin)
+        cx1 = min(x1, xmax)
+        cy1 = min(y1, ymax)
+        if cx0 > cx1 or cy0 > cy1:
+            self.reject(x0, y0, x1, y1)
+            return
+        w = x1 - x0 + 1
+        self.blit_rows(cx0, cy0, cx1, cy1, data, w * 2,
+                       ((cy0 - y0) * w + cx0 - x0) * 2, out)
+
+    def buffer_block(self, x0, y0, x1, y1, data):
+        """Copy a block of RGB565 data to the off-screen buffer.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            data (bytes): Data buffer to copy.
+        """
+        fb = memoryview(self.framebuffer)
+        src = memoryview(data)
+        row_bytes = (x1 - x0 + 1) * 2
+        stride = self.width * 2
+        size = len(src)
+        dst = (y0 * self.width + x0) * 2
+        if row_bytes == stride:
+            # Full width rows are contiguous in the buffer
+            n = min(size, (y1 - y0 + 1) * stride)
+            fb[dst:dst + n] = src[:n]
+        else:
+            pos = 0
+            for y in range(y0, y1 + 1):
+                if pos >= size:
+                    break
+                n = min(row_bytes, size - pos)
+                fb[dst:dst + n] = src[pos:pos + n]
+                pos += n
+                dst += stride
+        self.mark_dirty(x0, y0, x1, y1)
+
+    def circle_extents(self, r):
+        """Return the row half widths of a filled circle.
+
+        Args:
+            r (int): Radius.
+        Returns:
+            array: Half width per row distance from the center (0 to r),
+            the scratch entries of the span table.
+        """
+        ext = self.span_table(2 * r + 1)[2]
+        for d in range(r + 1):
+            ext[d] = 0
+        f = 1 - r
+        dx = 1
+        dy = -r - r
+        x = 0
+        y = r
+        while x < y:
+            if f >= 0:
+                y -= 1
+                dy += 2
+                f += dy
+            x += 1
+            dx += 2
+            f += dx
+            # Columns x0 +/- x reach row y, columns x0 +/- y reach row x
+            if ext[y] < x:
+                ext[y] = x
+            if ext[x] < y:
+                ext[x] = y
+        # Columns reach every row nearer the center than their end
+        for d in range(r - 1, -1, -1):
+            if ext[d] < ext[d + 1]:
+                ext[d] = ext[d + 1]
+        return ext
 
     def cleanup(self):
         """Clean up resources."""
         self.clear()
+        self.flush()
         self.display_off()
         self.spi.deinit()
         print('display off')
 
+    def clip_line(self, x1, y1, x2, y2):
+        """Clip a line to the clip rectangle along its Bresenham path.
+
+        Args:
+            x1, y1 (int): Starting coordinates of the line
+            x2, y2 (int): Ending coordinates of the line
+        Returns:
+            tuple: First and last visible pixels (x1, y1, x2, y2) of the
+            line as drawn by draw_line_runs, or None if nothing is visible.
+        Note:
+            The error term is solved for the clip edges from the start of
+            the walk instead of intersecting the ideal line, so the visible
+            part keeps exactly the pixels of the full line, even when it
+            only grazes a corner.
+        """
+        xmin, ymin, xmax, ymax = self.clip
+        dx = abs(x2 - x1)
+        dy = abs(y2 - y1)
+        steep = dy > dx
+        if steep:  # Walk along y: swap the axes
+            x1, y1, x2, y2 = y1, x1, y2, x2
+            dx, dy = dy, dx
+            xmin, ymin, xmax, ymax = ymin, xmin, ymax, xmax
+        if x1 > x2:  # Same direction as draw_line_runs
+            x1, x2 = x2, x1
+            y1, y2 = y2, y1
+        ystep = 1 if y1 < y2 else -1
+        error = dx >> 1
+        # Visible steps k along the major axis, then the minor axis offsets
+        # n(k) = -((error - k * dy) // dx) that stay inside the clip
+        first = max(0, xmin - x1)
+        last = min(dx, xmax - x1)
+        lo, hi = ((ymin - y1, ymax - y1) if ystep > 0 else
+                  (y1 - ymax, y1 - ymin))
+        if dy:
+            first = max(first, (error + (lo - 1) * dx) // dy + 1)
+            last = min(last, (error + hi * dx) // dy)
+        elif not lo <= 0 <= hi:
+            first = last + 1
+        if first > last:
+            if steep:
+                x1, y1, x2, y2 = y1, x1, y2, x2
+            self.reject(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+            return None
+        n1 = -((error - first * dy) // dx) if dx else 0
+        n2 = -((error - last * dy) // dx) if dx else 0
+        if steep:
+            return (y1 + n1 * ystep, x1 + first,
+                    y1 + n2 * ystep, x1 + last)
+        return x1 + first, y1 + n1 * ystep, x1 + last, y1 + n2 * ystep
+
+    def clip_rect(self, x0, y0, x1, y1):
+        """Crop a rectangle to the clip rectangle.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+        Returns:
+            tuple: Cropped (x0, y0, x1, y1) or None if nothing is visible.
+        """
+        xmin, ymin, xmax, ymax = self.clip
+        cx0 = max(x0, xmin)
+        cy0 = max(y0, ymin)
+        cx1 = min(x1, xmax)
+        cy1 = min(y1, ymax)
+        if cx0 > cx1 or cy0 > cy1:
+            self.reject(x0, y0, x1, y1)
+            return None
+        return cx0, cy0, cx1, cy1
+
     def clear(self, color=0, hlines=8):
         """Clear display.
 
@@ -207,19 +625,19 @@ class Display(object):
             to execute.  hlines must be a factor of the display height.
             For example, for a 240 pixel height, valid values for hline
             would be 1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 16, 20, 24, 30, 40, etc.
-            Higher values may result in memory allocation errors.
+            Chunks come from the solid color pool, so hlines is capped at
+            FILL_CHUNK pixels per chunk and nothing is allocated per call.
         """
         w = self.width
         h = self.height
         assert hlines > 0 and h % hlines == 0, (
             "hlines must be a non-zero factor of height.")
         # Clear display
-        if color:
-            line = color.to_bytes(2, 'big') * (w * hlines)
-        else:
-            line = bytearray(w * 2 * hlines)
+        line = self.fill_buffer(color)
+        hlines = max(1, min(hlines, self.FILL_CHUNK // w))
         for y in range(0, h, hlines):
-            self.block(0, y, w - 1, y + hlines - 1, line)
+            rows = min(hlines, h - y)
+            self.block(0, y, w - 1, y + rows - 1, line[:w * rows * 2])
 
     def display_off(self):
         """Turn display off."""
@@ -332,10 +750,10 @@ class Display(object):
             w (int): Width of line.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x + w - 1, y):
+        r = self.clip_rect(x, y, x + w - 1, y)
+        if r is None:
             return
-        line = color.to_bytes(2, 'big') * w
-        self.block(x, y, x + w - 1, y, line)
+        self.fill_block(r[0], r[1], r[2], r[3], color)
 
     def draw_image(self, path, x=0, y=0, w=320, h=240):
         """Draw image from flash.
@@ -346,28 +764,81 @@ class Display(object):
             y (int): Y coordinate of image top.  Default is 0.
             w (int): Width of image.  Default is 320.
             h (int): Height of image.  Default is 240.
+        Note:
+            The file is streamed with readinto() through the chunk
+            buffer of image_buffer, which is reused from one image to the
+            next.  Only one chunk is held at a time, so images larger
+            than RAM can be drawn.  Rows outside the clip rectangle are
+            skipped without being read and columns are cropped.
         """
         x2 = x + w - 1
         y2 = y + h - 1
         if self.is_off_grid(x, y, x2, y2):
             return
+        row_bytes = w * 2
+        buf = self.image_buffer(row_bytes)
+        chunk_height = len(buf) // row_bytes
+        # Rows outside the clip rectangle are never read
+        top = max(y, self.clip[1])
+        y2 = min(y2, self.clip[3])
+        with open(path, "rb") as f:
+            f.seek((top - y) * row_bytes)
+            chunk_y = top
+            while chunk_y <= y2:
+                rows = min(chunk_height, y2 - chunk_y + 1)
+                size = f.readinto(buf[:rows * row_bytes])
+                if not size:
+                    break
+                self.block(x, chunk_y, x2, chunk_y + rows - 1, buf[:size])
+                chunk_y += rows
+
+    def draw_packed_image(self, path, x=0, y=0):
+        """Draw a compressed image from flash.
+
+        Args:
+            path (string): Image file path (see convertir_imagen.py).
+            x (int): X coordinate of image left.  Default is 0.
+            y (int): Y coordinate of image top.  Default is 0.
+        Returns:
+            tuple(int, int): Image width and height (0, 0 on error,
+            including a file that ends before the last row).
+        Note:
+            The file starts with a 4 byte format tag and the big-endian
+            16 bit width and height.  Supported formats:
+            RL16: runs of (count - 1, RGB565 msb, lsb) that may wrap rows.
+            PAL4/PAL8: big-endian 16 bit palette size, RGB565 palette and
+            4 or 8 bit indices per pixel (PAL4 rows padded to a byte).
+            Rows are expanded straight into the image chunk buffer.
+        """
         with open(path, "rb") as f:
-            chunk_height = 1024 // w
-            chunk_count, remainder = divmod(h, chunk_height)
-            chunk_size = chunk_height * w * 2
-            chunk_y = y
-            if chunk_count:
-                for c in range(0, chunk_count):
-                    buf = f.read(chunk_size)
-                    self.block(x, chunk_y,
-                               x2, chunk_y + chunk_height - 1,
-                               buf)
-                    chunk_y += chunk_height
-            if remainder:
-                buf = f.read(remainder * w * 2)
-                self.block(x, chunk_y,
-                           x2, chunk_y + remainder - 1,
-                           buf)
+            header = f.read(8)
+            if len(header) < 8:
+                print('Truncated image header: {0}'.format(path))
+                return 0, 0
+            tag = header[0:4]
+            w = header[4] << 8 | header[5]
+            h = header[6] << 8 | header[7]
+            if tag not in (b'RL16', b'PAL4', b'PAL8'):
+                print('Unknown image format: {0}'.format(tag))
+                return 0, 0
+            x2 = x + w - 1
+            y2 = y + h - 1
+            if self.is_off_grid(x, y, x2, y2):
+                return 0, 0
+            row_bytes = w * 2
+            buf = self.image_buffer(row_bytes)
+            chunk_height = len(buf) // row_bytes
+            if tag == b'RL16':
+                complete = self._decode_rle(f, x, y, x2, y2, buf,
+                                            chunk_height)
+            else:
+                complete = self._decode_palette(f, x, y, x2, y2, buf,
+                                                chunk_height,
+                                                4 if tag == b'PAL4' else 8)
+        if not complete:
+            print('Truncated image data: {0}'.format(path))
+            return 0, 0
+        return w, h
 
     def draw_letter(self, x, y, letter, font, color, background=0,
                     landscape=False, rotate_180=False):
@@ -382,21 +853,11 @@ class Display(object):
             background (int): RGB565 background color (default: black)
             landscape (bool): Orientation (default: False = portrait)
             rotate_180 (bool): Rotate text by 180 degrees
+        Note:
+            The font caches glyphs per orientation, rotated ones included.
         """
-        buf, w, h = font.get_letter(letter, color, background, landscape)
-        if rotate_180:
-            # Manually rotate the buffer by 180 degrees
-            # ensure bytes pairs for each pixel retain color565
-            new_buf = bytearray(len(buf))
-            num_pixels = len(buf) // 2
-            for i in range(num_pixels):
-                # The index for the new buffer's byte pair
-                new_idx = (num_pixels - 1 - i) * 2
-                # The index for the original buffer's byte pair
-                old_idx = i * 2
-                # Swap the pixels
-                new_buf[new_idx], new_buf[new_idx + 1] = buf[old_idx], buf[old_idx + 1]
-            buf = new_buf
+        buf, w, h = font.get_letter(letter, color, background, landscape,
+                                    rotate_180)
 
         # Check for errors (Font could be missing specified letter)
         if w == 0:
@@ -437,40 +898,91 @@ class Display(object):
                 y1, y2 = y2, y1
             self.draw_vline(x1, y1, y2 - y1 + 1, color)
             return
-        # Confirm coordinates in boundary
-        if self.is_off_grid(min(x1, x2), min(y1, y2),
-                            max(x1, x2), max(y1, y2)):
+        xmin, ymin, xmax, ymax = self.clip
+        if not (xmin <= x1 <= xmax and xmin <= x2 <= xmax and
+                ymin <= y1 <= ymax and ymin <= y2 <= ymax):
+            visible = self.clip_line(x1, y1, x2, y2)
+            if visible is None:
+                return
+            # Longest run is the visible major axis length
+            n = max(abs(visible[2] - visible[0]),
+                    abs(visible[3] - visible[1])) + 1
+            self.draw_line_runs(x1, y1, x2, y2, self.fill_line(color, n),
+                                visible)
             return
-        # Changes in x, y
-        dx = x2 - x1
-        dy = y2 - y1
-        # Determine how steep the line is
-        is_steep = abs(dy) > abs(dx)
-        # Rotate line
-        if is_steep:
-            x1, y1 = y1, x1
-            x2, y2 = y2, x2
-        # Swap start and end points if necessary
-        if x1 > x2:
-            x1, x2 = x2, x1
-            y1, y2 = y2, y1
-        # Recalculate differentials
-        dx = x2 - x1
-        dy = y2 - y1
-        # Calculate error
-        error = dx >> 1
-        ystep = 1 if y1 < y2 else -1
-        y = y1
-        for x in range(x1, x2 + 1):
-            # Had to reverse HW ????
-            if not is_steep:
-                self.draw_pixel(x, y, color)
-            else:
-                self.draw_pixel(y, x, color)
-            error -= abs(dy)
-            if error < 0:
-                y += ystep
-                error += dx
+        # Longest possible run is the major axis length
+        n = max(abs(x2 - x1), abs(y2 - y1)) + 1
+        self.draw_line_runs(x1, y1, x2, y2, self.fill_line(color, n))
+
+    def draw_line_runs(self, x1, y1, x2, y2, line, visible=None):
+        """Draw a line as horizontal or vertical runs (Bresenham).
+
+        Args:
+            x1, y1 (int): Starting coordinates of the line
+            x2, y2 (int): Ending coordinates of the line
+            line (memoryview): Colour buffer covering the longest run.
+            visible (Optional tuple): Part of the line inside the clip
+                rectangle as returned by clip_line (default: whole line).
+        Note:
+            A shallow line is split into horizontal runs and a steep line
+            into vertical runs.  Each run is sent with a single block()
+            using a slice of the precomputed colour buffer.  A visible
+            part starts the walk mid-line with the error term computed
+            directly, so clipped lines keep the pixels of the full line.
+            A zero length segment is drawn as a single pixel.
+        """
+        dx = abs(x2 - x1)
+        dy = abs(y2 - y1)
+        if dx >= dy:
+            # Shallow line: iterate x, one block per horizontal run
+            if x1 > x2:
+                x1, x2 = x2, x1
+                y1, y2 = y2, y1
+            ystep = 1 if y1 < y2 else -1
+            error = dx >> 1
+            y = y1
+            first, last = x1, x2
+            if visible is not None and dx:
+                first = min(visible[0], visible[2])
+                last = max(visible[0], visible[2])
+                e = error - (first - x1) * dy
+                y += -(e // dx) * ystep
+                error = e % dx
+            start = first
+            for x in range(first, last + 1):
+                error -= dy
+                if error < 0:
+                    self.block(start, y, x, y, line[:(x - start + 1) * 2])
+                    start = x + 1
+                    y += ystep
+                    error += dx
+            if start <= last:
+                self.block(start, y, last, y, line[:(last - start + 1) * 2])
+        else:
+            # Steep line: iterate y, one block per vertical run
+            if y1 > y2:
+                x1, x2 = x2, x1
+                y1, y2 = y2, y1
+            xstep = 1 if x1 < x2 else -1
+            error = dy >> 1
+            x = x1
+            first, last = y1, y2
+            if visible is not None:
+                first = min(visible[1], visible[3])
+                last = max(visible[1], visible[3])
+                e = error - (first - y1) * dx
+                x += -(e // dy) * xstep
+                error = e % dy
+            start = first
+            for y in range(first, last + 1):
+                error -= dx
+                if error < 0:
+                    self.block(x, start, x, y, line[:(y - start + 1) * 2])
+                    start = y + 1
+                    x += xstep
+                    error += dy
+            if start <= last:
+                self.block(x, start, x, last, line[:(last - start + 1) * 2])
 
     def draw_lines(self, coords, color):
         """Draw multiple lines.
@@ -479,13 +991,7 @@ class Display(object):
             coords ([[int, int],...]): Line coordinate X, Y pairs
             color (int): RGB565 color value.
         """
-        # Starting point
-        x1, y1 = coords[0]
-        # Iterate through coordinates
-        for i in range(1, len(coords)):
-            x2, y2 = coords[i]
-            self.draw_line(x1, y1, x2, y2, color)
-            x1, y1 = x2, y2
+        self.draw_polyline(coords, color)
 
     def draw_pixel(self, x, y, color):
         """Draw a single pixel.
@@ -523,6 +1029,36 @@ class Display(object):
         # Cast to python float first to fix rounding errors
         self.draw_lines(coords, color=color)
 
+    def draw_polyline(self, coords, color):
+        """Draw connected lines in a single pass.
+
+        Args:
+            coords ([[int, int],...]): Line coordinate X, Y pairs
+            color (int): RGB565 color value.
+        Note:
+            One colour buffer covering the longest run of the series is
+            shared by all segments, which are clipped to the clip
+            rectangle.
+        """
+        count = len(coords)
+        if count < 2:
+            return
+        # Size colour buffer for the longest segment
+        n = 1
+        x1, y1 = coords[0]
+        for i in range(1, count):
+            x2, y2 = coords[i]
+            n = max(n, abs(x2 - x1) + 1, abs(y2 - y1) + 1)
+            x1, y1 = x2, y2
+        line = self.fill_line(color, n)
+        x1, y1 = coords[0]
+        for i in range(1, count):
+            x2, y2 = coords[i]
+            visible = self.clip_line(x1, y1, x2, y2)
+            if visible is not None:
+                self.draw_line_runs(x1, y1, x2, y2, line, visible)
+            x1, y1 = x2, y2
+
     def draw_rectangle(self, x, y, w, h, color):
         """Draw a rectangle.
 
@@ -540,7 +1076,7 @@ class Display(object):
         self.draw_vline(x, y, h, color)
         self.draw_vline(x2, y, h, color)
 
-    def draw_sprite(self, buf, x, y, w, h):
+    def draw_sprite(self, buf, x, y, w, h, rotate=0):
         """Draw a sprite (optimized for horizontal drawing).
 
         Args:
@@ -549,7 +1085,13 @@ class Display(object):
             y (int): Starting Y position.
             w (int): Width of drawing.
             h (int): Height of drawing.
+            rotate (Optional int): Clockwise rotation 0, 90, 180 or 270
+                (w and h describe the unrotated sprite).
+        Note:
+            Sprites crossing the clip rectangle are cropped to it.
         """
+        if rotate:
+            buf, w, h = rotate565(buf, w, h, rotate)
         x2 = x + w - 1
         y2 = y + h - 1
         if self.is_off_grid(x, y, x2, y2):
@@ -570,35 +1112,69 @@ class Display(object):
             landscape (bool): Orientation (default: False = portrait)
             rotate_180 (bool): Rotate text by 180 degrees
             spacing (int): Pixels between letters (default: 1)
+        Note:
+            The whole string (glyphs, spacing and background) is composed
+            into one RGB565 buffer sized with font.measure_text and sent
+            with a single window.  Strings larger than TEXT_BUFFER_MAX
+            bytes are sent as a few row strips.  Glyphs come from the font
+            cache, which keeps each orientation already rotated.
         """
         iterable_text = reversed(text) if rotate_180 else text
+        glyphs = []
+        h = 0
         for letter in iterable_text:
             # Get letter array and letter dimensions
-            w, h = self.draw_letter(x, y, letter, font, color, background,
-                                    landscape, rotate_180)
+            buf, w, h = font.get_letter(letter, color, background, landscape,
+                                        rotate_180)
             # Stop on error
             if w == 0 or h == 0:
                 print('Invalid width {0} or height {1}'.format(w, h))
-                return
-
-            if landscape:
-                # Fill in spacing
-                if spacing:
-                    self.fill_hrect(x, y - w - spacing, h, spacing, background)
-                # Position y for next letter
-                y -= (w + spacing)
-            else:
-                # Fill in spacing
-                if spacing:
-                    self.fill_hrect(x + w, y, spacing, h, background)
-                # Position x for next letter
-                x += (w + spacing)
-
-                # # Fill in spacing
-                # if spacing:
-                #     self.fill_vrect(x + w, y, spacing, h, background)
-                # # Position x for next letter
-                # x += w + spacing
+                break
+            glyphs.append((buf, w))
+        count = len(glyphs)
+        if not count:
+            return
+        h = font.height
+        length = font.measure_text(
+            text[len(text) - count:] if rotate_180 else text[:count], spacing)
+        if landscape:
+            # Letters stack upwards from y, each one cw x w pixels
+            cw, ch = h, length
+            x0, y0 = x, y - length
+        else:
+            # Letters run right from x, each one w x ch pixels
+            cw, ch = length, h
+            x0, y0 = x, y
+        if self.is_off_grid(x0, y0, x0 + cw - 1, y0 + ch - 1):
+            return
+        row_bytes = cw * 2
+        strip_rows = min(ch, max(1, self.TEXT_BUFFER_MAX // row_bytes))
+        strip = bytearray(strip_rows * row_bytes)
+        mv = memoryview(strip)
+        for r0 in range(0, ch, strip_rows):
+            r1 = min(r0 + strip_rows, ch)
+            fill565(strip, background, 0, (r1 - r0) * row_bytes)
+            pos = 0  # Column (portrait) or bottom offset (landscape)
+            for buf, w in glyphs:
+                src = memoryview(buf)
+                if landscape:
+                    # Glyph rows are full composed rows
+                    top = ch - pos - w
+                    a = max(top, r0)
+                    b = min(top + w, r1)
+                    if a < b:
+                        mv[(a - r0) * row_bytes:(b - r0) * row_bytes] = (
+                            src[(a - top) * row_bytes:(b - top) * row_bytes])
+                else:
+                    glyph_row = w * 2
+                    dst = pos * 2
+                    for r in range(r0, r1):
+                        d = (r - r0) * row_bytes + dst
+                        mv[d:d + glyph_row] = (
+                            src[r * glyph_row:(r + 1) * glyph_row])
+                pos += w + spacing
+            self.block(x0, y0 + r0, x0 + cw - 1, y0 + r1 - 1,
+                       mv[:(r1 - r0) * row_bytes])
 
     def draw_text8x8(self, x, y, text, color,  background=0,
                      rotate=0):
@@ -614,44 +1190,18 @@ class Display(object):
         """
         w = len(text) * 8
         h = 8
-        # Confirm coordinates in boundary
-        if self.is_off_grid(x, y, x + 7, y + 7):
+        if rotate in (90, 270):
+            if self.is_off_grid(x, y, x + h - 1, y + w - 1):
+                return
+        elif self.is_off_grid(x, y, x + w - 1, y + h - 1):
             return
         buf = bytearray(w * 16)
         fbuf = FrameBuffer(buf, w, h, RGB565)
         if background != 0:
-            # Swap background color bytes to correct for framebuf endianness
-            b_color = ((background & 0xFF) << 8) | ((background & 0xFF00) >> 8)
-            fbuf.fill(b_color)
-        # Swap text color bytes to correct for framebuf endianness
-        t_color = ((color & 0xFF) << 8) | ((color & 0xFF00) >> 8)
-        fbuf.text(text, 0, 0, t_color)
-        if rotate == 0:
-            self.block(x, y, x + w - 1, y + (h - 1), buf)
-        elif rotate == 90:
-            buf2 = bytearray(w * 16)
-            fbuf2 = FrameBuffer(buf2, h, w, RGB565)
-            for y1 in range(h):
-                for x1 in range(w):
-                    fbuf2.pixel(y1, x1,
-                                fbuf.pixel(x1, (h - 1) - y1))
-            self.block(x, y, x + (h - 1), y + w - 1, buf2)
-        elif rotate == 180:
-            buf2 = bytearray(w * 16)
-            fbuf2 = FrameBuffer(buf2, w, h, RGB565)
-            for y1 in range(h):
-                for x1 in range(w):
-                    fbuf2.pixel(x1, y1,
-                                fbuf.pixel((w - 1) - x1, (h - 1) - y1))
-            self.block(x, y, x + w - 1, y + (h - 1), buf2)
-        elif rotate == 270:
-            buf2 = bytearray(w * 16)
-            fbuf2 = FrameBuffer(buf2, h, w, RGB565)
-            for y1 in range(h):
-                for x1 in range(w):
-                    fbuf2.pixel(y1, x1,
-                                fbuf.pixel((w - 1) - x1, y1))
-            self.block(x, y, x + (h - 1), y + w - 1, buf2)
+            fbuf.fill(self.native_color(background))
+        fbuf.text(text, 0, 0, self.native_color(color))
+        buf, w, h = rotate565(buf, w, h, rotate)
+        self.block(x, y, x + w - 1, y + h - 1, buf)
 
     def draw_vline(self, x, y, h, color):
         """Draw a vertical line.
@@ -662,11 +1212,56 @@ class Display(object):
             h (int): Height of line.
             color (int): RGB565 color value.
         """
-        # Confirm coordinates in boundary
-        if self.is_off_grid(x, y, x, y + h - 1):
+        r = self.clip_rect(x, y, x, y + h - 1)
+        if r is None:
             return
-        line = color.to_bytes(2, 'big') * h
-        self.block(x, y, x, y + h - 1, line)
+        self.fill_block(r[0], r[1], r[2], r[3], color)
+
+    def fill_block(self, x0, y0, x1, y1, color):
+        """Fill a rectangle with a pooled solid color buffer.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            color (int): RGB565 color value.
+        Note:
+            Sent in chunks of whole rows of up to FILL_CHUNK pixels.
+        """
+        w = x1 - x0 + 1
+        line = self.fill_line(color, w)
+        rows = max(1, self.FILL_CHUNK // w)
+        for y in range(y0, y1 + 1, rows):
+            n = min(rows, y1 - y + 1)
+            self.block(x0, y, x1, y + n - 1, line[:w * n * 2])
+
+    def fill_buffer(self, color):
+        """Return the pooled solid color buffer of a color.
+
+        Args:
+            color (int): RGB565 color value.
+        Returns:
+            memoryview: FILL_CHUNK pixels of the color.
+        Note:
+            Up to FILL_POOL_SIZE colors are kept, most recently used
+            first.  A new color refills the least recently used buffer in
+            place, so after warm up solid fills allocate nothing.
+        """
+        pool = self._fills
+        for i in range(len(pool)):
+            if pool[i][0] == color:
+                if i:
+                    pool.insert(0, pool.pop(i))
+                return pool[0][1]
+        if len(pool) < self.FILL_POOL_SIZE:
+            entry = [color, memoryview(bytearray(self.FILL_CHUNK * 2))]
+        else:
+            entry = pool.pop()
+            entry[0] = color
+        fill565(entry[1], color)
+        pool.insert(0, entry)
+        return entry[1]
 
     def fill_circle(self, x0, y0, r, color):
         """Draw a filled circle.
@@ -677,24 +1272,7 @@ class Display(object):
             r (int): Radius.
             color (int): RGB565 color value.
         """
-        f = 1 - r
-        dx = 1
-        dy = -r - r
-        x = 0
-        y = r
-        self.draw_vline(x0, y0 - r, 2 * r + 1, color)
-        while x < y:
-            if f >= 0:
-                y -= 1
-                dy += 2
-                f += dy
-            x += 1
-            dx += 2
-            f += dx
-            self.draw_vline(x0 + x, y0 - y, 2 * y + 1, color)
-            self.draw_vline(x0 - x, y0 - y, 2 * y + 1, color)
-            self.draw_vline(x0 - y, y0 - x, 2 * x + 1, color)
-            self.draw_vline(x0 + y, y0 - x, 2 * x + 1, color)
+        self.fill_symmetric(x0, y0, self.circle_extents(r), r, color)
 
     def fill_ellipse(self, x0, y0, a, b, color):
         """Draw a filled ellipse.
@@ -710,6 +1288,9 @@ class Display(object):
             up to complete on a full pixel.  Therefore the major and
             minor axes are increased by 1.
         """
+        ext = self.span_table(2 * b + 1)[2]
+        for d in range(b + 1):
+            ext[d] = -1
         a2 = a * a
         b2 = b * b
         twoa2 = a2 + a2
@@ -718,8 +1299,8 @@ class Display(object):
         y = b
         px = 0
         py = twoa2 * y
-        # Plot initial points
-        self.draw_line(x0, y0 - y, x0, y0 + y, color)
+        # Initial column
+        ext[y] = 0
         # Region 1
         p = round(b2 - (a2 * b) + (0.25 * a2))
         while px < py:
@@ -731,8 +1312,7 @@ class Display(object):
                 y -= 1
                 py -= twoa2
                 p += b2 + px - py
-            self.draw_line(x0 + x, y0 - y, x0 + x, y0 + y, color)
-            self.draw_line(x0 - x, y0 - y, x0 - x, y0 + y, color)
+            ext[y] = x
         # Region 2
         p = round(b2 * (x + 0.5) * (x + 0.5) +
                   a2 * (y - 1) * (y - 1) - a2 * b2)
@@ -745,8 +1325,12 @@ class Display(object):
                 x += 1
                 px += twob2
                 p += a2 - py + px
-            self.draw_line(x0 + x, y0 - y, x0 + x, y0 + y, color)
-            self.draw_line(x0 - x, y0 - y, x0 - x, y0 + y, color)
+            ext[y] = x
+        # Columns reach every row nearer the center than their end
+        for d in range(b - 1, -1, -1):
+            if ext[d] < ext[d + 1]:
+                ext[d] = ext[d + 1]
+        self.fill_symmetric(x0, y0, ext, b, color)
 
     def fill_hrect(self, x, y, w, h, color):
         """Draw a filled rectangle (optimized for horizontal drawing).
@@ -758,25 +1342,10 @@ class Display(object):
             h (int): Height of rectangle.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x + w - 1, y + h - 1):
+        r = self.clip_rect(x, y, x + w - 1, y + h - 1)
+        if r is None:
             return
-        chunk_height = 1024 // w
-        chunk_count, remainder = divmod(h, chunk_height)
-        chunk_size = chunk_height * w
-        chunk_y = y
-        if chunk_count:
-            buf = color.to_bytes(2, 'big') * chunk_size
-            for c in range(0, chunk_count):
-                self.block(x, chunk_y,
-                           x + w - 1, chunk_y + chunk_height - 1,
-                           buf)
-                chunk_y += chunk_height
-
-        if remainder:
-            buf = color.to_bytes(2, 'big') * remainder * w
-            self.block(x, chunk_y,
-                       x + w - 1, chunk_y + remainder - 1,
-                       buf)
+        self.fill_block(r[0], r[1], r[2], r[3], color)
 
     def fill_rectangle(self, x, y, w, h, color):
         """Draw a filled rectangle.
@@ -788,13 +1357,30 @@ class Display(object):
             h (int): Height of rectangle.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x + w - 1, y + h - 1):
+        r = self.clip_rect(x, y, x + w - 1, y + h - 1)
+        if r is None:
             return
+        x, y = r[0], r[1]
+        w = r[2] - x + 1
+        h = r[3] - y + 1
         if w > h:
             self.fill_hrect(x, y, w, h, color)
         else:
             self.fill_vrect(x, y, w, h, color)
 
+    def fill_line(self, color, n):
+        """Return a solid color buffer of at least n pixels.
+
+        Args:
+            color (int): RGB565 color value.
+            n (int): Pixels needed.
+        Returns:
+            memoryview: Pooled buffer, or a new one past FILL_CHUNK pixels.
+        """
+        if n <= self.FILL_CHUNK:
+            return self.fill_buffer(color)
+        return memoryview(color.to_bytes(2, 'big') * n)
+
     def fill_polygon(self, sides, x0, y0, r, color, rotate=0):
         """Draw a filled n-sided regular polygon.
 
@@ -816,27 +1402,17 @@ class Display(object):
         for s in range(n):
             t = 2.0 * pi * s / sides + theta
             coords.append([int(r * cos(t) + x0), int(r * sin(t) + y0)])
-        # Starting point
+        top = min(c[1] for c in coords)
+        count = max(c[1] for c in coords) - top + 1
+        lo, hi = self.span_table(count)[:2]
+        for i in range(count):
+            lo[i] = 32767
+            hi[i] = -32768
+        # Minimum and maximum X per row along the Bresenham perimeter
         x1, y1 = coords[0]
-        # Minimum Maximum X dict
-        xdict = {y1: [x1, x1]}
-        # Iterate through coordinates
         for row in coords[1:]:
             x2, y2 = row
             xprev, yprev = x2, y2
-            # Calculate perimeter
-            # Check for horizontal side
-            if y1 == y2:
-                if x1 > x2:
-                    x1, x2 = x2, x1
-                if y1 in xdict:
-                    xdict[y1] = [min(x1, xdict[y1][0]), max(x2, xdict[y1][1])]
-                else:
-                    xdict[y1] = [x1, x2]
-                x1, y1 = xprev, yprev
-                continue
-            # Non horizontal side
-            # Changes in x, y
             dx = x2 - x1
             dy = y2 - y1
             # Determine how steep the line is
@@ -851,31 +1427,165 @@ class Display(object):
                 y1, y2 = y2, y1
             # Recalculate differentials
             dx = x2 - x1
-            dy = y2 - y1
-            # Calculate error
+            dy = abs(y2 - y1)
             error = dx >> 1
             ystep = 1 if y1 < y2 else -1
             y = y1
-            # Calcualte minimum and maximum x values
             for x in range(x1, x2 + 1):
                 if is_steep:
-                    if x in xdict:
-                        xdict[x] = [min(y, xdict[x][0]), max(y, xdict[x][1])]
-                    else:
-                        xdict[x] = [y, y]
+                    i, px = x - top, y
                 else:
-                    if y in xdict:
-                        xdict[y] = [min(x, xdict[y][0]), max(x, xdict[y][1])]
-                    else:
-                        xdict[y] = [x, x]
-                error -= abs(dy)
+                    i, px = y - top, x
+                if px < lo[i]:
+                    lo[i] = px
+                if px > hi[i]:
+                    hi[i] = px
+                error -= dy
                 if error < 0:
                     y += ystep
                     error += dx
             x1, y1 = xprev, yprev
-        # Fill polygon
-        for y, x in xdict.items():
-            self.draw_hline(x[0], y, x[1] - x[0] + 2, color)
+        # Spans end one pixel past the perimeter, as they always have
+        for i in range(count):
+            hi[i] += 1
+        self.fill_spans(top, count, color)
+
+    def fill_round_rectangle(self, x, y, w, h, r, color):
+        """Draw a filled rectangle with rounded corners.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+            r (int): Corner radius (limited to fit the rectangle).
+            color (int): RGB565 color value.
+        """
+        r = max(0, min(r, (w - 1) // 2, (h - 1) // 2))
+        ext = self.circle_extents(r)
+        lo, hi = self.span_table(h)[:2]
+        x2 = x + w - 1
+        for i in range(h):
+            # Distance from the corner circle centers, 0 between them
+            d = max(r - i, i - (h - 1 - r), 0)
+            inset = r - ext[d] if d else 0
+            lo[i] = x + inset
+            hi[i] = x2 - inset
+        self.fill_spans(y, h, color)
+
+    def fill_shape(self, coords, color):
+        """Draw an arbitrary filled polygon (convex or concave).
+
+        Args:
+            coords ([[int, int],...]): Vertex X, Y pairs (closed
+                automatically).
+            color (int): RGB565 color value.
+        Note:
+            Vertices lie on pixel corners and pixels whose centers are
+            inside are filled (even-odd rule), so the square
+            [[0, 0], [8, 0], [8, 8], [0, 8]] fills 8 x 8 pixels.
+            Every span of a row is written once.
+        """
+        n = len(coords)
+        if n < 3:
+            return
+        top = min(c[1] for c in coords)
+        bottom = max(c[1] for c in coords)
+        xmin, ymin, xmax, ymax = self.clip
+        xmax += 1
+        ymin = max(top, ymin)
+        ymax = min(bottom, ymax + 1)
+        # One color buffer wide enough for any clipped span
+        widest = (min(max(c[0] for c in coords), xmax) -
+                  max(min(c[0] for c in coords), xmin))
+        if widest <= 0:
+            return
+        line = self.fill_line(color, widest)
+        crossings = array('h', bytes(2 * n))
+        for y in range(ymin, ymax):
+            # Sample row at its pixel centers
+            yc = 2 * y + 1
+            count = 0
+            x1, y1 = coords[-1]
+            for x2, y2 in coords:
+                if (y1 <= y < y2) or (y2 <= y < y1):
+                    if y1 > y2:
+                        xa, ya, xb, yb = x2, y2, x1, y1
+                    else:
+                        xa, ya, xb, yb = x1, y1, x2, y2
+                    dy = yb - ya
+                    # First pixel right of the crossing: ceil(x - 0.5)
+                    num = 2 * xa * dy + (xb - xa) * (yc - 2 * ya) - dy
+                    xc = -((-num) // (2 * dy))
+                    # Insertion sort keeps crossings ordered
+                    k = count
+                    while k and crossings[k - 1] > xc:
+                        crossings[k] = crossings[k - 1]
+                        k -= 1
+                    crossings[k] = xc
+                    count += 1
+                x1, y1 = x2, y2
+            for k in range(0, count - 1, 2):
+                xs = max(crossings[k], xmin)
+                xe = min(crossings[k + 1], xmax)
+                if xe > xs:
+                    self.block(xs, y, xe - 1, y, line[:(xe - xs) * 2])
+
+    def fill_spans(self, y, count, color):
+        """Fill the rows held in the span table, each row exactly once.
+
+        Args:
+            y (int): Screen row of the first table entry.
+            count (int): Number of rows.
+            color (int): RGB565 color value.
+        Note:
+            Spans are clipped to the clip rectangle.  Consecutive rows
+            with the same span are sent as one block.
+        """
+        lo = self._span_lo
+        hi = self._span_hi
+        xmin, ymin, xmax, ymax = self.clip
+        first = max(0, ymin - y)
+        last = min(count, ymax + 1 - y)
+        widest = 0
+        for i in range(first, last):
+            w = min(hi[i], xmax) - max(lo[i], xmin) + 1
+            if w > widest:
+                widest = w
+        if widest <= 0:
+            return
+        rows = max(1, min(last - first, self.FILL_CHUNK // widest))
+        line = self.fill_line(color, widest * rows)
+        i = first
+        while i < last:
+            x0 = max(lo[i], xmin)
+            x1 = min(hi[i], xmax)
+            # Group following rows with the same span
+            j = i + 1
+            while (j < last and j - i < rows and lo[j] == lo[i] and
+                   hi[j] == hi[i]):
+                j += 1
+            if x1 >= x0:
+                self.block(x0, y + i, x1, y + j - 1,
+                           line[:(x1 - x0 + 1) * (j - i) * 2])
+            i = j
+
+    def fill_symmetric(self, x0, y0, ext, b, color):
+        """Fill a shape symmetric about its center from row half widths.
+
+        Args:
+            x0, y0 (int): Coordinates of center point.
+            ext (array): Half width per row distance from the center,
+                entries 0 to b.
+            b (int): Half height.
+            color (int): RGB565 color value.
+        """
+        lo, hi = self.span_table(2 * b + 1)[:2]
+        for d in range(b + 1):
+            e = ext[d]
+            lo[b - d] = lo[b + d] = x0 - e
+            hi[b - d] = hi[b + d] = x0 + e
+        self.fill_spans(y0 - b, 2 * b + 1, color)
 
     def fill_vrect(self, x, y, w, h, color):
         """Draw a filled rectangle (optimized for vertical drawing).
@@ -887,25 +1597,55 @@ class Display(object):
             h (int): Height of rectangle.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x + w - 1, y + h - 1):
+        r = self.clip_rect(x, y, x + w - 1, y + h - 1)
+        if r is None:
             return
-        chunk_width = 1024 // h
-        chunk_count, remainder = divmod(w, chunk_width)
-        chunk_size = chunk_width * h
-        chunk_x = x
-        if chunk_count:
-            buf = color.to_bytes(2, 'big') * chunk_size
-            for c in range(0, chunk_count):
-                self.block(chunk_x, y,
-                           chunk_x + chunk_width - 1, y + h - 1,
-                           buf)
-                chunk_x += chunk_width
-
-        if remainder:
-            buf = color.to_bytes(2, 'big') * remainder * h
-            self.block(chunk_x, y,
-                       chunk_x + remainder - 1, y + h - 1,
-                       buf)
+        x, y = r[0], r[1]
+        w = r[2] - x + 1
+        h = r[3] - y + 1
+        line = self.fill_line(color, h)
+        chunk_width = max(1, self.FILL_CHUNK // h)
+        x2 = x + w - 1
+        for chunk_x in range(x, x2 + 1, chunk_width):
+            cols = min(chunk_width, x2 - chunk_x + 1)
+            self.block(chunk_x, y, chunk_x + cols - 1, y + h - 1,
+                       line[:cols * h * 2])
+
+    def flush(self):
+        """Push dirty regions of the off-screen buffer to the display.
+
+        Note:
+            Does nothing unless the display was created with buffered=True.
+        """
+        if self.framebuffer is None:
+            return
+        stride = self.width * 2
+        for x0, y0, x1, y1 in self.dirty:
+            self.blit_rows(x0, y0, x1, y1, self.framebuffer, stride,
+                           y0 * stride + x0 * 2, self.write_block)
+        self.dirty = []
+
+    def image_buffer(self, row_bytes):
+        """Return the chunk buffer used to stream images.
+
+        Args:
+            row_bytes (int): Bytes per image row.
+        Returns:
+            memoryview: Buffer holding a whole number of rows.
+        Note:
+            The buffer is allocated on first use and reused afterwards.
+            Its size adapts to the free heap (a sixteenth of it, capped at
+            IMAGE_CHUNK_MAX) and is reallocated only if a row doesn't fit.
+        """
+        buf = self._image_buf
+        if buf is None or len(buf) < row_bytes:
+            self._image_buf = None
+            gc.collect()
+            size = min(self.IMAGE_CHUNK_MAX, gc.mem_free() // 16)
+            size = max(row_bytes, size - size % 2)
+            buf = memoryview(bytearray(size))
+            self._image_buf = buf
+        return buf[:len(buf) - len(buf) % row_bytes]
 
     def invert(self, enable=True):
         """Enables or disables inversion of display colors.
@@ -919,7 +1659,7 @@ class Display(object):
             self.write_cmd(self.INVOFF)
 
     def is_off_grid(self, xmin, ymin, xmax, ymax):
-        """Check if coordinates extend past display boundaries.
+        """Check if coordinates lie entirely outside the clip rectangle.
 
         Args:
             xmin (int): Minimum horizontal pixel.
@@ -927,21 +1667,15 @@ class Display(object):
             xmax (int): Maximum horizontal pixel.
             ymax (int): Maximum vertical pixel.
         Returns:
-            boolean: False = Coordinates OK, True = Error.
+            boolean: False = Something is visible, True = Nothing to draw.
+        Note:
+            Partially visible regions are cropped by the drawing methods.
+            Rejections are counted in clipped and reported to clip_log
+            if set, never printed.
         """
-        if xmin < 0:
-            print('x-coordinate: {0} below minimum of 0.'.format(xmin))
-            return True
-        if ymin < 0:
-            print('y-coordinate: {0} below minimum of 0.'.format(ymin))
-            return True
-        if xmax >= self.width:
-            print('x-coordinate: {0} above maximum of {1}.'.format(
-                xmax, self.width - 1))
-            return True
-        if ymax >= self.height:
-            print('y-coordinate: {0} above maximum of {1}.'.format(
-                ymax, self.height - 1))
+        xmin_, ymin_, xmax_, ymax_ = self.clip
+        if xmax < xmin_ or ymax < ymin_ or xmin > xmax_ or ymin > ymax_:
+            self.reject(xmin, ymin, xmax, ymax)
             return True
         return False
 
@@ -959,6 +1693,12 @@ class Display(object):
         with open(path, "rb") as f:
             return f.read(buf_size)
 
+    def reject(self, xmin, ymin, xmax, ymax):
+        """Count a draw that fell outside the clip rectangle."""
+        self.clipped += 1
+        if self.clip_log is not None:
+            self.clip_log(xmin, ymin, xmax, ymax)
+
     def reset_cpy(self):
         """Perform reset: Low=initialization, High=normal operation.
 
@@ -979,6 +1719,10 @@ class Display(object):
         self.rst(1)
         sleep(.05)
 
+    def reset_clip(self):
+        """Make the whole display drawable again."""
+        self.clip = (0, 0, self.width - 1, self.height - 1)
+
     def scroll(self, y):
         """Scroll display vertically.
 
@@ -987,6 +1731,18 @@ class Display(object):
         """
         self.write_cmd(self.VSCRSADD, y >> 8, y & 0xFF)
 
+    def set_clip(self, x, y, w, h):
+        """Restrict drawing to a rectangle (cropped to the display).
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of the drawable area.
+            h (int): Height of the drawable area.
+        """
+        self.clip = (max(x, 0), max(y, 0), min(x + w, self.width) - 1,
+                     min(y + h, self.height) - 1)
+
     def set_scroll(self, top, bottom):
         """Set the height of the top and bottom scroll margins.
 
@@ -1015,6 +1771,144 @@ class Display(object):
         else:
             self.write_cmd(self.SLPOUT)
 
+    def span_table(self, count):
+        """Return the span table arrays, grown to hold count rows.
+
+        Args:
+            count (int): Rows needed.
+        Returns:
+            tuple: (lo, hi, ext) int16 arrays of at least count entries.
+        """
+        if len(self._span_lo) < count:
+            self._span_lo = array('h', bytes(2 * count))
+            self._span_hi = array('h', bytes(2 * count))
+            self._span_ext = array('h', bytes(2 * count))
+        return self._span_lo, self._span_hi, self._span_ext
+
+    def write_block_mpy(self, x0, y0, x1, y1, data):
+        """Write a block of data directly to display memory (MicroPython).
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            data (bytes): Data buffer to write.
+        Note:
+            CS stays asserted for the whole CASET/PASET/RAMWR/data
+            sequence, commands reuse preallocated buffers and CASET/PASET
+            are skipped when the window is unchanged (RAMWR always resets
+            the write pointer to the start of the window).
+        """
+        spi = self.spi
+        dc = self.dc
+        cmd = self._cmd
+        args = self._arg_views[4]  # CASET/PASET arguments
+        self.cs(0)
+        col = x0 << 16 | x1
+        if col != self._col:
+            self._col = col
+            dc(0)
+            cmd[0] = self.SET_COLUMN
+            spi.write(cmd)
+            args[0] = x0 >> 8
+            args[1] = x0 & 0xff
+            args[2] = x1 >> 8
+            args[3] = x1 & 0xff
+            dc(1)
+            spi.write(args)
+        page = y0 << 16 | y1
+        if page != self._page:
+            self._page = page
+            dc(0)
+            cmd[0] = self.SET_PAGE
+            spi.write(cmd)
+            args[0] = y0 >> 8
+            args[1] = y0 & 0xff
+            args[2] = y1 >> 8
+            args[3] = y1 & 0xff
+            dc(1)
+            spi.write(args)
+        dc(0)
+        cmd[0] = self.WRITE_RAM
+        spi.write(cmd)
+        dc(1)
+        spi.write(data)
+        self.cs(1)
+        self.blocks_written += 1
+        self.bytes_written += len(data)
+
+    def write_block_cpy(self, x0, y0, x1, y1, data):
+        """Write a block of data directly to display memory (CircuitPython).
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            data (bytes): Data buffer to write.
+        Note:
+            Same sequence as write_block_mpy with the SPI lock held once.
+        """
+        spi = self.spi
+        dc = self.dc
+        cmd = self._cmd
+        args = self._arg_views[4]  # CASET/PASET arguments
+        self.cs.value = False
+        # Confirm SPI locked before writing
+        while not spi.try_lock():
+            pass
+        col = x0 << 16 | x1
+        if col != self._col:
+            self._col = col
+            dc.value = False
+            cmd[0] = self.SET_COLUMN
+            spi.write(cmd)
+            args[0] = x0 >> 8
+            args[1] = x0 & 0xff
+            args[2] = x1 >> 8
+            args[3] = x1 & 0xff
+            dc.value = True
+            spi.write(args)
+        page = y0 << 16 | y1
+        if page != self._page:
+            self._page = page
+            dc.value = False
+            cmd[0] = self.SET_PAGE
+            spi.write(cmd)
+            args[0] = y0 >> 8
+            args[1] = y0 & 0xff
+            args[2] = y1 >> 8
+            args[3] = y1 & 0xff
+            dc.value = True
+            spi.write(args)
+        dc.value = False
+        cmd[0] = self.WRITE_RAM
+        spi.write(cmd)
+        dc.value = True
+        spi.write(data)
+        spi.unlock()
+        self.cs.value = True
+        self.blocks_written += 1
+        self.bytes_written += len(data)
+
+    def pack_args(self, args):
+        """Copy command arguments to the preallocated argument buffer.
+
+        Args:
+            args (tuple): Argument bytes.
+        Returns:
+            memoryview: View of the buffer holding exactly the arguments
+            (a new bytearray if there are more than ARGS_MAX).
+        """
+        n = len(args)
+        if n > self.ARGS_MAX:
+            return bytearray(args)
+        buf = self._args
+        for i in range(n):
+            buf[i] = args[i]
+        return self._arg_views[n]
+
     def write_cmd_mpy(self, command, *args):
         """Write command to OLED (MicroPython).
 
@@ -1022,13 +1916,16 @@ class Display(object):
             command (byte): ILI9341 command code.
             *args (optional bytes): Data to transmit.
         """
+        # Any command may move the address window, drop the cached one
+        self._col = self._page = -1
+        self._cmd[0] = command
         self.dc(0)
         self.cs(0)
-        self.spi.write(bytearray([command]))
+        self.spi.write(self._cmd)
         self.cs(1)
         # Handle any passed data
         if len(args) > 0:
-            self.write_data(bytearray(args))
+            self.write_data(self.pack_args(args))
 
     def write_cmd_cpy(self, command, *args):
         """Write command to OLED (CircuitPython).
@@ -1037,17 +1934,20 @@ class Display(object):
             command (byte): ILI9341 command code.
             *args (optional bytes): Data to transmit.
         """
+        # Any command may move the address window, drop the cached one
+        self._col = self._page = -1
+        self._cmd[0] = command
         self.dc.value = False
         self.cs.value = False
         # Confirm SPI locked before writing
         while not self.spi.try_lock():
             pass
-        self.spi.write(bytearray([command]))
+        self.spi.write(self._cmd)
         self.spi.unlock()
         self.cs.value = True
         # Handle any passed data
         if len(args) > 0:
-            self.write_data(bytearray(args))
+            self.write_data(self.pack_args(args))
 
     def write_data_mpy(self, data):
         """Write data to OLED (MicroPython).
@@ -0,0 +1,37 @@
+"""Viper pixel kernels for the ILI9341 driver (optional).
+
+Imported by ili9341 when the firmware has the native emitters enabled;
+the driver falls back to plain Python otherwise.
+"""
+import micropython  # type: ignore
+
+
+@micropython.viper
+def reverse565_into(src: ptr16, dst: ptr16, n: int):  # noqa: F821
+    """Copy n RGB565 pixels from src to dst in reverse order."""
+    j = n - 1
+    for i in range(n):
+        dst[j - i] = src[i]
+
+
+@micropython.viper
+def rotate565_into(src: ptr16, dst: ptr16, w: int, h: int,  # noqa: F821
+                   rotate: int):
+    """Rotate a w x h RGB565 image clockwise by 90 or 270 degrees.
+
+    The destination is h pixels wide and w pixels tall.
+    """
+    if rotate == 90:
+        for y in range(h):
+            s = y * w
+            d = h - 1 - y
+            for x in range(w):
+                dst[d] = src[s + x]
+                d += h
+    else:
+        for y in range(h):
+            s = y * w
+            d = (w - 1) * h + y
+            for x in range(w):
+                dst[d] = src[s + x]
+                d -= h
@@ -0,0 +1,1088 @@
+"""
+Pruebas y mediciones de los controladores en la PC.
+
+Corre con el puerto unix de MicroPython, que trae framebuf y micropython:
+
+    micropython pruebas_host.py              (todas las secciones)
+    micropython pruebas_host.py lineas ...   (solo las secciones dadas)
+
+El bus SPI se simula: ContadorSPI solo cuenta escrituras y bytes, y
+PanelSPI además decodifica los comandos del ILI9341 a un arreglo de
+píxeles para comparar lo que se dibujó.
+"""
+import gc
+import os
+import sys
+from array import array
+try:
+    from time import sleep_us, ticks_diff, ticks_us
+except ImportError:  # CPython con framebuf simulado
+    from time import perf_counter_ns, sleep
+
+    def ticks_us():
+        return perf_counter_ns() // 1000
+
+    def ticks_diff(a, b):
+        return a - b
+
+    def sleep_us(us):
+        sleep(us / 1000000)
+
+import ili9341
+
+
+class Pin(object):
+    """Pin simulado: guarda el último valor."""
+    OUT = 1
+    IN = 0
+
+    def __init__(self, value=1):
+        self.v = value
+
+    def __call__(self, v=None):
+        if v is None:
+            return self.v
+        self.v = v
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def value(self, v=None):
+        return self(v)
+
+
+class ContadorSPI(object):
+    """SPI simulado que cuenta escrituras y bytes."""
+
+    def __init__(self):
+        self.writes = 0
+        self.bytes = 0
+
+    def deinit(self):
+        pass
+
+    def write(self, data):
+        self.writes += 1
+        self.bytes += len(data)
+
+
+class PanelSPI(ContadorSPI):
+    """SPI simulado que decodifica CASET, PASET y RAMWR a píxeles."""
+
+    def __init__(self, dc, width=240, height=320):
+        ContadorSPI.__init__(self)
+        self.dc = dc
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(width * height * 2)
+        self.cmd = None
+        self.args = bytearray()
+        self.window = [0, 0, 0, 0]
+        self.x = self.y = 0
+
+    def pixel(self, x, y):
+        i = (y * self.width + x) * 2
+        return self.pixels[i] << 8 | self.pixels[i + 1]
+
+    def write(self, data):
+        ContadorSPI.write(self, data)
+        if not self.dc():
+            self.cmd = data[0]
+            self.args = bytearray()
+            if self.cmd == 0x2C:
+                self.x, self.y = self.window[0], self.window[2]
+            return
+        if self.cmd in (0x2A, 0x2B):
+            self.args += data
+            if len(self.args) >= 4:
+                a = self.args
+                i = 0 if self.cmd == 0x2A else 2
+                self.window[i] = a[0] << 8 | a[1]
+                self.window[i + 1] = a[2] << 8 | a[3]
+        elif self.cmd == 0x2C:
+            x0, x1 = self.window[0], self.window[1]
+            x, y = self.x, self.y
+            for k in range(0, len(data) - 1, 2):
+                if x < self.width and y < self.height:
+                    i = (y * self.width + x) * 2
+                    self.pixels[i] = data[k]
+                    self.pixels[i + 1] = data[k + 1]
+                x += 1
+                if x > x1:
+                    x = x0
+                    y += 1
+            self.x, self.y = x, y
+
+
+class LentoSPI(ContadorSPI):
+    """SPI simulado que tarda lo que el bus real en mandar cada byte.
+
+    Espera activa, como spi.write() en el ESP32, que no suelta el GIL.
+    """
+
+    def __init__(self, baudrate=40000000):
+        ContadorSPI.__init__(self)
+        self.ns_byte = 8000000000 // baudrate
+
+    def write(self, data):
+        ContadorSPI.write(self, data)
+        end = ticks_us() + len(data) * self.ns_byte // 1000
+        while ticks_diff(end, ticks_us()) > 0:
+            pass
+
+
+class DormidoSPI(ContadorSPI):
+    """SPI simulado que duerme lo que tarda el bus en mandar cada byte.
+
+    Dormir suelta el GIL, como haría una escritura por DMA.  El tiempo se
+    acumula y se duerme de a 1 ms o más, porque cada sleep cuesta decenas
+    de µs aunque pida menos.
+    """
+
+    def __init__(self, baudrate=40000000, escala=1):
+        ContadorSPI.__init__(self)
+        self.ns_byte = 8000000000 // baudrate * escala
+        self.pendiente = 0  # ns de bus aún sin dormir
+
+    def write(self, data):
+        ContadorSPI.write(self, data)
+        self.pendiente += len(data) * self.ns_byte
+        if self.pendiente >= 1000000:
+            sleep_us(self.pendiente // 1000)
+            self.pendiente %= 1000
+
+
+class ColaSPI(object):
+    """Prototipo de cola de transferencias con doble búfer.
+
+    Copia cada bloque a uno de dos búferes; uno lleno lo manda un hilo
+    mientras se dibuja en el otro.  Sin _thread (o con hilo=False) lo
+    manda quien lo entrega.  Se puede esperar con await hasta que todo
+    lo entregado salió.  No forma parte del controlador: en los puertos
+    reales spi.write() no suelta el GIL y la cola no gana nada.
+    """
+
+    BLOQUES = 64  # Bloques por búfer
+
+    def __init__(self, escribir, tam=4096, callback=None, hilo=True):
+        self.escribir = escribir
+        self.tam = tam
+        self.callback = callback
+        self.bufs = (memoryview(bytearray(tam)), memoryview(bytearray(tam)))
+        # Por bloque: x0, y0, x1, y1 y el fin de sus datos en el búfer
+        self.ventanas = (array('H', bytes(10 * self.BLOQUES)),
+                         array('H', bytes(10 * self.BLOQUES)))
+        self.cuenta = [0, 0]
+        self.usado = [0, 0]
+        self.actual = 0  # Búfer que se está llenando
+        self.libre = None  # Tomado mientras un búfer se llena o se manda
+        self.lleno = None  # Se suelta al entregar un búfer al hilo
+        self.corriendo = False
+        if not hilo:
+            return
+        try:
+            import _thread
+        except ImportError:
+            return
+        self.libre = (_thread.allocate_lock(), _thread.allocate_lock())
+        self.lleno = (_thread.allocate_lock(), _thread.allocate_lock())
+        self.lleno[0].acquire()
+        self.lleno[1].acquire()
+        self.libre[0].acquire()
+        self.corriendo = True
+        _thread.start_new_thread(self.hilo, ())
+
+    def __await__(self):
+        while self.ocupada():
+            yield
+
+    def ocupada(self):
+        if self.cuenta[self.actual]:
+            return True
+        return self.libre is not None and self.libre[self.actual ^ 1].locked()
+
+    def entregar(self):
+        i = self.actual
+        if not self.cuenta[i]:
+            return
+        if self.libre is None:
+            self.mandar(i)
+            return
+        self.lleno[i].release()
+        i ^= 1
+        self.libre[i].acquire()  # Espera a que el hilo suelte el otro
+        self.actual = i
+
+    def vaciar(self):
+        self.entregar()
+        if self.libre is not None:
+            candado = self.libre[self.actual ^ 1]
+            candado.acquire()
+            candado.release()
+
+    def mandar(self, i):
+        v = self.ventanas[i]
+        datos = self.bufs[i]
+        inicio = 0
+        for k in range(0, self.cuenta[i] * 5, 5):
+            fin = v[k + 4]
+            self.escribir(v[k], v[k + 1], v[k + 2], v[k + 3],
+                          datos[inicio:fin])
+            inicio = fin
+        self.cuenta[i] = 0
+        self.usado[i] = 0
+        if self.callback is not None:
+            self.callback()
+
+    def detener(self):
+        self.vaciar()
+        if self.corriendo:
+            self.corriendo = False
+            self.lleno[self.actual].release()
+
+    def bloque(self, x0, y0, x1, y1, data):
+        """Mismos argumentos que Display.write_block; copia los datos."""
+        n = len(data)
+        if n > self.tam:
+            fila = (x1 - x0 + 1) * 2
+            filas = self.tam // fila
+            if not filas:  # Una fila no cabe: se manda directo
+                self.vaciar()
+                self.escribir(x0, y0, x1, y1, data)
+                return
+            mv = memoryview(data)
+            inicio = 0
+            for y in range(y0, y1 + 1, filas):
+                k = min(filas, y1 - y + 1)
+                self.bloque(x0, y, x1, y + k - 1,
+                            mv[inicio:inicio + k * fila])
+                inicio += k * fila
+            return
+        i = self.actual
+        if self.usado[i] + n > self.tam or self.cuenta[i] == self.BLOQUES:
+            self.entregar()
+            i = self.actual
+        inicio = self.usado[i]
+        self.bufs[i][inicio:inicio + n] = data
+        v = self.ventanas[i]
+        k = self.cuenta[i] * 5
+        v[k] = x0
+        v[k + 1] = y0
+        v[k + 2] = x1
+        v[k + 3] = y1
+        v[k + 4] = inicio + n
+        self.cuenta[i] += 1
+        self.usado[i] = inicio + n
+
+    def hilo(self):
+        i = 0
+        while True:
+            self.lleno[i].acquire()
+            if not self.corriendo:
+                return
+            self.mandar(i)
+            self.libre[i].release()
+            i ^= 1
+
+
+class TactilSPI(object):
+    """SPI simulado del XPT2046: posición fija más ruido uniforme."""
+
+    def __init__(self, x=1000, y=1000, noise=8):
+        self.pos = {0b11010000: x, 0b10010000: y}
+        self.noise = noise
+        self.seed = 1
+
+    def write_readinto(self, tx, rx):
+        self.seed = self.seed * 1103515245 + 12345 & 0x7FFFFFFF
+        v = (self.pos[tx[0]] - self.noise +
+             (self.seed >> 16) % (2 * self.noise + 1))
+        rx[1] = v >> 4
+        rx[2] = (v & 0x0F) << 4
+
+
+def pantalla(spi=None, **kwargs):
+    """Crea un Display sobre un SPI simulado (PanelSPI por defecto)."""
+    dc = Pin(0)
+    if spi is None:
+        spi = PanelSPI(dc)
+    ili9341.sleep = lambda s: None  # Sin esperas del reset
+    return ili9341.Display(spi, Pin(), dc, Pin(), **kwargs), spi
+
+
+def medir(func, repeat=1):
+    """Regresa los µs promedio de func()."""
+    start = ticks_us()
+    for _ in range(repeat):
+        func()
+    return ticks_diff(ticks_us(), start) // repeat
+
+
+def asignado(func, repeat=100):
+    """Regresa los bytes de heap que asigna func() en promedio."""
+    func()  # Calentar cachés y pools
+    if hasattr(gc, 'mem_alloc'):  # MicroPython: sin recolectar entre medio
+        gc.collect()
+        gc.disable()
+        start = gc.mem_alloc()
+        for _ in range(repeat):
+            func()
+        total = gc.mem_alloc() - start
+        gc.enable()
+        return total // repeat
+    import tracemalloc  # CPython: pico de cada llamada, aproximado
+    tracemalloc.start()
+    total = 0
+    for _ in range(repeat):
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        func()
+        total += tracemalloc.get_traced_memory()[1] - start
+    tracemalloc.stop()
+    return total // repeat
+
+
+def memoria(func):
+    """Regresa (resultado, bytes de pico, bytes residentes) de func()."""
+    if hasattr(gc, 'mem_alloc'):  # MicroPython: todo lo asignado es el pico
+        gc.collect()
+        gc.disable()
+        start = gc.mem_alloc()
+        result = func()
+        pico = gc.mem_alloc() - start
+        gc.enable()
+        gc.collect()
+        return result, pico, gc.mem_alloc() - start
+    import tracemalloc
+    tracemalloc.start()
+    result = func()
+    residente, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, pico, residente
+
+
+def lineas():
+    """Segmentos de largo cero y recorte de líneas."""
+    d, panel = pantalla()
+    # Vértices repetidos: antes dividían entre cero al recortar
+    d.draw_lines([[5, 5], [5, 5]], 0xFFFF)
+    assert panel.pixel(5, 5) == 0xFFFF
+    d.draw_polyline([[10, 10], [30, 20], [30, 20], [10, 10]], 0xF800)
+    assert panel.pixel(10, 10) == 0xF800 and panel.pixel(30, 20) == 0xF800
+    d.draw_polygon(3, 60, 60, 20, 0x07E0)
+    # Con recorte se conservan los píxeles de la línea completa
+    completa, panel_c = pantalla()
+    recortada, panel_r = pantalla()
+    recortada.set_clip(40, 30, 161, 251)  # x 40..200, y 30..280
+    for x1, y1, x2, y2 in ((0, 0, 239, 319), (239, 5, 0, 300), (3, 150, 236, 170),
+                           (120, 0, 125, 319), (50, 50, 50, 50), (100, 100, 100, 100),
+                           (-108, 459, 255, 313)):
+        completa.draw_lines([[x1, y1], [x2, y2]], 0xFFFF)
+        recortada.draw_lines([[x1, y1], [x2, y2]], 0xFFFF)
+    # La última solo roza la esquina de la pantalla: Bresenham pasa por
+    # (239, 319) aunque la recta ideal cruce y = 319 en x = 240
+    d, panel = pantalla()
+    d.draw_lines([[-108, 459], [255, 313]], 0xFFFF)
+    assert panel.pixel(239, 319) == 0xFFFF and not d.clipped
+    diferentes = 0
+    for y in range(320):
+        for x in range(240):
+            dentro = 40 <= x <= 200 and 30 <= y <= 280
+            esperado = panel_c.pixel(x, y) if dentro else 0
+            if panel_r.pixel(x, y) != esperado:
+                diferentes += 1
+    assert diferentes == 0, diferentes
+    print('lineas: vértices repetidos y recorte ok')
+
+
+def buffer():
+    """Escrituras SPI y bytes de un mismo cuadro, directo y con buffer."""
+    puntos = [[20 + i * 7, 150 - (i * 37 % 60)] for i in range(30)]
+
+    def cuadro(d):
+        # Como un cuadro del tablero: paneles, gráfica, medidores y textos
+        d.fill_rectangle(10, 10, 220, 100, 0xC618)
+        d.draw_rectangle(10, 10, 220, 100, 0x03DB)
+        d.draw_polyline(puntos, 0x03DB)
+        for x in (60, 180):
+            d.draw_circle(x, 200, 40, 0x03DB)
+            d.fill_circle(x, 200, 30, 0xFD20)
+        d.draw_text8x8(20, 15, 'Datos del Sensor', 0, 0xC618)
+        d.fill_rectangle(0, 300, 240, 20, 0xC618)
+        d.draw_text8x8(10, 306, 'Lectura: 57%', 0, 0xC618)
+        d.flush()
+
+    for nombre, buffered in (('directo', False), ('buffer', True)):
+        d, spi = pantalla(ContadorSPI(), buffered=buffered)
+        escrituras = spi.writes
+        enviados = spi.bytes
+        us = medir(lambda: cuadro(d))
+        print('buffer: %-8s %6d escrituras SPI, %7d bytes, %6d us'
+              % (nombre, spi.writes - escrituras, spi.bytes - enviados, us))
+    # Los dos modos dejan los mismos píxeles en el panel
+    paneles = []
+    for buffered in (False, True):
+        d, panel = pantalla(buffered=buffered)
+        cuadro(d)
+        paneles.append(panel.pixels)
+    assert paneles[0] == paneles[1]
+
+
+def asignaciones():
+    """Bytes asignados por bloque y por relleno, antes y ahora."""
+    d, spi = pantalla(ContadorSPI())
+    data = bytearray(32 * 2)
+    colores = (0xF800, 0x07E0, 0x001F, 0xFFFF, 0xFFE0, 0x07FF, 0xF81F, 0)
+
+    def comando_antes(command, *args):
+        # write_cmd_mpy anterior: un bytearray para el comando y otro para
+        # los argumentos en cada llamada
+        d.dc(0)
+        d.cs(0)
+        d.spi.write(bytearray([command]))
+        d.cs(1)
+        if len(args) > 0:
+            d.write_data(bytearray(args))
+
+    def bloque_antes():
+        # block() anterior: tres comandos con CS por separado
+        comando_antes(d.SET_COLUMN, 0, 10, 0, 41)
+        comando_antes(d.SET_PAGE, 0, 20, 0, 20)
+        comando_antes(d.WRITE_RAM)
+        d.write_data(data)
+
+    def bloque_ahora():
+        # Ventana sin cambios: solo RAMWR y los datos
+        d.block(10, 20, 41, 20, data)
+
+    def comando_ahora():
+        # Solo la tupla de *args; los argumentos van en _args
+        d.write_cmd(d.VSCRSADD, 0, 0)
+
+    def relleno_antes():
+        # Sin pool: un búfer nuevo por cada relleno
+        buf = memoryview(bytearray(d.FILL_CHUNK * 2))
+        ili9341.fill565(buf, 0xF800)
+
+    def rellenos(n):
+        def func():
+            for color in colores[:n]:
+                d.fill_rectangle(0, 0, 64, 16, color)
+        return func
+
+    for nombre, func in (('bloque, antes', bloque_antes),
+                         ('bloque, ahora', bloque_ahora),
+                         ('comando, antes',
+                          lambda: comando_antes(d.VSCRSADD, 0, 0)),
+                         ('comando, ahora', comando_ahora),
+                         ('relleno sin pool', relleno_antes),
+                         ('4 colores con pool', rellenos(4)),
+                         ('8 colores con pool', rellenos(8))):
+        escrituras = spi.writes
+        b = asignado(func)
+        print('asignaciones: %-20s %6d bytes, %3d escrituras SPI por llamada'
+              % (nombre, b, (spi.writes - escrituras) // 101))
+    if not hasattr(gc, 'mem_alloc'):
+        # En CPython un spi.write() del simulador ya cuesta 32 bytes (los
+        # contadores son enteros en el heap) y tracemalloc da el pico, no
+        # el total, así que los bytearray temporales de antes no se suman
+        print('asignaciones: en CPython son solo aproximados; que block() '
+              'con la ventana fija no asigna nada solo se mide con '
+              'gc.mem_alloc en MicroPython')
+
+
+def cola():
+    """Escritura directa contra la cola de transferencias con doble búfer."""
+    puntos = [[(i * 53) % 240, (i * 97) % 320] for i in range(40)]
+
+    def escena(d):
+        # Mezcla de líneas, círculos, rellenos y texto: muchos bloques
+        for k in range(4):
+            d.draw_polyline(puntos, 0x03DB + k)
+            for x in (40, 120, 200):
+                d.fill_circle(x, 80 * k + 40, 30, 0xFD20 + k)
+                d.draw_circle(x, 80 * k + 40, 36, 0xFFFF)
+            d.fill_rectangle(0, 80 * k, 240, 10, 0xC618)
+            for r in range(8):
+                d.draw_text8x8(4, 80 * k + 12 + r * 8, 'Lectura %d: 57%%' % r,
+                               0xFFFF, 0)
+
+    def con_cola(spi, hilo=True, llamadas=None):
+        d, spi = pantalla(spi)
+
+        def aviso():
+            llamadas[0] += 1
+        q = ColaSPI(d.write_block, d.FLUSH_CHUNK,
+                    None if llamadas is None else aviso, hilo)
+        d.write_block = q.bloque
+        return d, spi, q
+
+    # La cola deja los mismos píxeles que la escritura directa
+    d, panel = pantalla()
+    escena(d)
+    bloques = d.blocks_written
+    q_d, q_panel, q = con_cola(None)
+    escena(q_d)
+    q.detener()
+    assert q_panel.pixels == panel.pixels
+    print('cola: escena de %d bloques, mismos píxeles con la cola' % bloques)
+
+    for nombre, bus, hilo in (
+            ('bus dormido 40 MHz', lambda: DormidoSPI(), True),
+            ('bus dormido 4 MHz', lambda: DormidoSPI(escala=10), True),
+            ('bus con espera activa', LentoSPI, True),
+            ('un búfer, sin hilo', LentoSPI, False)):
+        # El mejor de 5 cuadros: el planificador mete mucho ruido
+        d, spi = pantalla(bus())
+        directo = min(medir(lambda: escena(d)) for _ in range(5))
+        d, spi, q = con_cola(bus(), hilo)
+
+        def encolado():
+            escena(d)
+            q.vaciar()
+        encolada = min(medir(encolado) for _ in range(5))
+        q.detener()
+        print('cola: %-22s directo %7.1f ms, con cola %7.1f ms'
+              % (nombre, directo / 1000, encolada / 1000))
+
+    # Callback por búfer mandado y await hasta que la cola se vacía
+    try:
+        import uasyncio as asyncio
+    except ImportError:
+        import asyncio
+    llamadas = [0]
+    d, spi, q = con_cola(DormidoSPI(), True, llamadas)
+
+    async def cuadro():
+        escena(d)
+        q.entregar()
+        await q
+        return q.ocupada()
+
+    ocupada = asyncio.run(cuadro())
+    q.detener()
+    assert not ocupada and llamadas[0] > 0
+    print('cola: await listo, callback %d veces' % llamadas[0])
+
+
+def imagenes():
+    """Lectura, decodificación y envío de una imagen por formato."""
+    import convertir_imagen
+    origen = 'MicroPython128x128.raw'
+    pixeles = convertir_imagen.leer_raw(origen, 128, 128)
+    # Las paletas necesitan menos colores: 8 y 64 tonos respectivamente
+    pal4 = [c & 0x8410 for c in pixeles]
+    pal8 = [c & 0xC618 for c in pixeles]
+    archivos = [('raw', origen)]
+    for nombre, datos in (
+            ('RL16', convertir_imagen.codificar_rle(pixeles, 128, 128)),
+            ('PAL4', convertir_imagen.codificar_paleta(pal4, 128, 128, 4)),
+            ('PAL8', convertir_imagen.codificar_paleta(pal8, 128, 128, 8))):
+        with open('prueba.' + nombre, 'wb') as f:
+            f.write(datos)
+        archivos.append((nombre, 'prueba.' + nombre))
+    d, spi = pantalla(LentoSPI())
+    envio = d.block
+
+    def dibujar(archivo):
+        if archivo == origen:
+            d.draw_image(archivo, 0, 0, 128, 128)
+        else:
+            d.draw_packed_image(archivo)
+
+    def leer(archivo):
+        # Solo la lectura, en trozos del tamaño del búfer de imagen
+        buf = d.image_buffer(256)
+        with open(archivo, 'rb') as f:
+            while f.readinto(buf):
+                pass
+
+    for nombre, archivo in archivos:
+        lectura = medir(lambda: leer(archivo), 5)
+        d.block = lambda *args: None  # Decodificar sin enviar
+        decodificar = medir(lambda: dibujar(archivo), 5)
+        d.block = envio
+        total = medir(lambda: dibujar(archivo), 5)
+        print('imagenes: %-4s %6d bytes leídos, lectura %6d us, '
+              'decodificación %6d us, envío %6d us'
+              % (nombre, os.stat(archivo)[6], lectura,
+                 max(decodificar - lectura, 0), max(total - decodificar, 0)))
+        if archivo != origen:
+            os.remove(archivo)
+
+
+def fuentes():
+    """Arranque y heap del cargador de texto contra el binario XGF1."""
+    import convertir_fuente
+    from xglcd_font import XglcdFont
+    # Fuente X-GLCD de 16x24 con columnas pseudoaleatorias
+    tam = convertir_fuente.bytes_por_letra(16, 24)
+    semilla = 1
+    with open('prueba_fuente.c', 'w') as f:
+        for letra in range(96):
+            columnas = [16]
+            for _ in range(tam - 1):
+                semilla = semilla * 1103515245 + 12345 & 0x7FFFFFFF
+                columnas.append(semilla >> 16 & 0xFF)
+            f.write(','.join('0x%02X' % b for b in columnas))
+            f.write(',  // Code for char %d\n' % (letra + 32))
+    convertir_fuente.convertir('prueba_fuente.c', 'prueba_fuente.bin', 16, 24)
+    esperado = None
+    for nombre, archivo, lazy in (('texto', 'prueba_fuente.c', False),
+                                  ('XGF1', 'prueba_fuente.bin', False),
+                                  ('XGF1 lazy', 'prueba_fuente.bin', True)):
+        us = medir(lambda: XglcdFont(archivo, 16, 24, lazy=lazy).close(), 5)
+        fuente, pico, residente = memoria(
+            lambda: XglcdFont(archivo, 16, 24, lazy=lazy))
+        glifos = bytes(fuente.glyph(65 - 32))
+        fuente.close()
+        esperado = esperado or glifos
+        assert glifos == esperado, nombre
+        print('fuentes: %-9s carga %7d us, pico %6d bytes, residente %6d bytes'
+              % (nombre, us, pico, residente))
+    # Redibujar un texto cuesta lo mismo en cualquier orientación: los
+    # glifos girados 180° salen de la caché ya invertidos
+    fuente = XglcdFont('prueba_fuente.bin', 16, 24, cache_bytes=16384)
+    d, spi = pantalla(ContadorSPI())
+    for landscape, rotate_180 in ((False, False), (True, False),
+                                  (False, True), (True, True)):
+        def texto():
+            d.draw_text(20, 200, 'HR 72', fuente, 0xFFFF, 0, landscape,
+                        rotate_180)
+        fallos = fuente.misses
+        texto()
+        nuevos = fuente.misses - fallos
+        b = asignado(texto)
+        assert fuente.misses - fallos == nuevos
+        print('fuentes: draw_text %3d°, %d glifos a la caché, redibujo %5d '
+              'bytes' % ((90 if landscape else 0) + (180 if rotate_180 else 0),
+                         nuevos, b))
+    normal = fuente.get_letter('H', 0xFFFF)[0]
+    girado = fuente.get_letter('H', 0xFFFF, rotate_180=True)[0]
+    assert girado == ili9341.reverse565(normal)
+    fuente.close()
+    os.remove('prueba_fuente.c')
+    os.remove('prueba_fuente.bin')
+
+
+def tactil():
+    """Muestras/s, error y jitter del filtro táctil, antes y ahora."""
+    import xpt2046
+    # Posición exacta en pantalla del punto crudo (1000, 1000)
+    real_x = 240 * (1000 - 100) / (1962 - 100)
+    real_y = 320 * (1000 - 100) / (1900 - 100)
+
+    def antes(touch):
+        # get_touch() anterior sin las esperas: lista de muestras, media y
+        # desviación recalculadas en cada muestra, calibración flotante
+        buff = [[0, 0] for _ in range(5)]
+        estado = [0, 0]  # buffptr, nsamples
+        x_mul = 240 / (1962 - 100)
+        x_add = 100 * -x_mul
+        y_mul = 320 / (1900 - 100)
+        y_add = 100 * -y_mul
+
+        def paso():
+            sample = touch.raw_touch()
+            if sample is None:
+                estado[1] = 0
+                return None
+            buff[estado[0]] = sample
+            estado[0] = (estado[0] + 1) % 5
+            estado[1] = min(estado[1] + 1, 5)
+            if estado[1] < 5:
+                return None
+            meanx = sum([c[0] for c in buff]) // 5
+            meany = sum([c[1] for c in buff]) // 5
+            dev = sum([(c[0] - meanx)**2 +
+                       (c[1] - meany)**2 for c in buff]) / 5
+            if dev > 50:
+                return None
+            return int(x_mul * meanx + x_add), int(y_mul * meany + y_add)
+        return paso
+
+    def ahora(touch):
+        # El camino de step(): anillo con sumas incrementales y
+        # calibración en punto fijo
+        def paso():
+            sample = touch.raw_touch()
+            if sample is None:
+                touch.reset_filter()
+                return None
+            if not touch.add_sample(*sample):
+                return None
+            return touch.normalize(*touch.filtered())
+        return paso
+
+    for nombre, version, median in (('antes', antes, False),
+                                    ('media', ahora, False),
+                                    ('mediana', ahora, True)):
+        paso = version(xpt2046.Touch(TactilSPI(), Pin(), median=median))
+        posiciones = []
+        start = ticks_us()
+        for _ in range(2000):
+            pos = paso()
+            if pos is not None:
+                posiciones.append(pos)
+        us = ticks_diff(ticks_us(), start)
+        xs = [p[0] for p in posiciones]
+        ys = [p[1] for p in posiciones]
+        error = sum(abs(x - real_x) + abs(y - real_y)
+                    for x, y in posiciones) / len(posiciones)
+        print('tactil: %-7s %6d muestras/s, %4d posiciones, error medio '
+              '%.2f px, jitter x %d px, y %d px'
+              % (nombre, 2000 * 1000000 // us, len(posiciones), error,
+                 max(xs) - min(xs), max(ys) - min(ys)))
+
+
+def figuras():
+    """Bloques y píxeles enviados por figura, antes y con span table."""
+    def circulo_antes(d, x0, y0, r, color):
+        # fill_circle anterior: columnas de Bresenham, con traslape
+        f = 1 - r
+        dx = 1
+        dy = -r - r
+        x = 0
+        y = r
+        d.draw_vline(x0, y0 - r, 2 * r + 1, color)
+        while x < y:
+            if f >= 0:
+                y -= 1
+                dy += 2
+                f += dy
+            x += 1
+            dx += 2
+            f += dx
+            d.draw_vline(x0 + x, y0 - y, 2 * y + 1, color)
+            d.draw_vline(x0 - x, y0 - y, 2 * y + 1, color)
+            d.draw_vline(x0 - y, y0 - x, 2 * x + 1, color)
+            d.draw_vline(x0 + y, y0 - x, 2 * x + 1, color)
+
+    def elipse_antes(d, x0, y0, a, b, color):
+        # fill_ellipse anterior: una columna por cada paso en x
+        a2 = a * a
+        b2 = b * b
+        x = 0
+        y = b
+        px = 0
+        py = 2 * a2 * y
+        d.draw_vline(x0, y0 - y, 2 * y + 1, color)
+        p = round(b2 - (a2 * b) + (0.25 * a2))
+        while px < py:
+            x += 1
+            px += 2 * b2
+            if p < 0:
+                p += b2 + px
+            else:
+                y -= 1
+                py -= 2 * a2
+                p += b2 + px - py
+            d.draw_vline(x0 + x, y0 - y, 2 * y + 1, color)
+            d.draw_vline(x0 - x, y0 - y, 2 * y + 1, color)
+        p = round(b2 * (x + 0.5) * (x + 0.5) +
+                  a2 * (y - 1) * (y - 1) - a2 * b2)
+        while y > 0:
+            y -= 1
+            py -= 2 * a2
+            if p > 0:
+                p += a2 - py
+            else:
+                x += 1
+                px += 2 * b2
+                p += a2 - py + px
+            d.draw_vline(x0 + x, y0 - y, 2 * y + 1, color)
+            d.draw_vline(x0 - x, y0 - y, 2 * y + 1, color)
+
+    def poligono_antes(d, sides, x0, y0, r, color):
+        # fill_polygon anterior: mínimo y máximo por fila en un dict de
+        # listas, con el perímetro trazado lado por lado
+        from math import cos, pi, sin
+        coords = []
+        for s in range(sides + 1):
+            t = 2.0 * pi * s / sides
+            coords.append([int(r * cos(t) + x0), int(r * sin(t) + y0)])
+        x1, y1 = coords[0]
+        xdict = {y1: [x1, x1]}
+        for row in coords[1:]:
+            x2, y2 = row
+            xprev, yprev = x2, y2
+            if y1 == y2:
+                if x1 > x2:
+                    x1, x2 = x2, x1
+                if y1 in xdict:
+                    xdict[y1] = [min(x1, xdict[y1][0]), max(x2, xdict[y1][1])]
+                else:
+                    xdict[y1] = [x1, x2]
+                x1, y1 = xprev, yprev
+                continue
+            dx = x2 - x1
+            dy = y2 - y1
+            is_steep = abs(dy) > abs(dx)
+            if is_steep:
+                x1, y1 = y1, x1
+                x2, y2 = y2, x2
+            if x1 > x2:
+                x1, x2 = x2, x1
+                y1, y2 = y2, y1
+            dx = x2 - x1
+            dy = y2 - y1
+            error = dx >> 1
+            ystep = 1 if y1 < y2 else -1
+            y = y1
+            for x in range(x1, x2 + 1):
+                if is_steep:
+                    if x in xdict:
+                        xdict[x] = [min(y, xdict[x][0]), max(y, xdict[x][1])]
+                    else:
+                        xdict[x] = [y, y]
+                else:
+                    if y in xdict:
+                        xdict[y] = [min(x, xdict[y][0]), max(x, xdict[y][1])]
+                    else:
+                        xdict[y] = [x, x]
+                error -= abs(dy)
+                if error < 0:
+                    y += ystep
+                    error += dx
+            x1, y1 = xprev, yprev
+        for y, x in xdict.items():
+            d.draw_hline(x[0], y, x[1] - x[0] + 2, color)
+
+    estrella = [[120, 40], [140, 110], [210, 110], [155, 150], [175, 220],
+                [120, 180], [65, 220], [85, 150], [30, 110], [100, 110]]
+    figuras = (
+        ('fill_circle r=40', lambda d: circulo_antes(d, 120, 160, 40, 0xF800),
+         lambda d: d.fill_circle(120, 160, 40, 0xF800)),
+        ('fill_ellipse 60x30',
+         lambda d: elipse_antes(d, 120, 160, 60, 30, 0x07E0),
+         lambda d: d.fill_ellipse(120, 160, 60, 30, 0x07E0)),
+        ('fill_polygon 6 r=50',
+         lambda d: poligono_antes(d, 6, 120, 160, 50, 0x001F),
+         lambda d: d.fill_polygon(6, 120, 160, 50, 0x001F)),
+        ('fill_round_rectangle', None,
+         lambda d: d.fill_round_rectangle(20, 100, 200, 120, 16, 0xFFE0)),
+        ('fill_shape estrella', None,
+         lambda d: d.fill_shape(estrella, 0xF81F)),
+    )
+
+    def contar(version):
+        d, panel = pantalla()
+        bloques = d.blocks_written
+        pixeles = d.bytes_written
+        escrituras = panel.writes
+        version(d)
+        return ((d.blocks_written - bloques, (d.bytes_written - pixeles) // 2,
+                 panel.writes - escrituras), panel.pixels)
+
+    for nombre, antes, ahora in figuras:
+        cuenta, panel = contar(ahora)
+        if antes is None:  # Sin versión anterior
+            print('figuras: %-20s ahora %4d bloques %6d píxeles %5d escrituras'
+                  % ((nombre,) + cuenta))
+            continue
+        cuenta_antes, panel_antes = contar(antes)
+        assert panel_antes == panel, nombre
+        print('figuras: %-20s antes %4d bloques %6d píxeles %5d escrituras,'
+              ' ahora %4d bloques %6d píxeles %5d escrituras'
+              % ((nombre,) + cuenta_antes + cuenta))
+
+
+def rotaciones():
+    """Tiempo por rotación de rotate565, draw_sprite y draw_text8x8."""
+    print('rotaciones: kernels viper %s'
+          % ('sí' if ili9341.rotate565_into is not None else 'no'))
+    d, spi = pantalla(ContadorSPI())
+    sprite = bytearray(range(256)) * 32  # 64 x 64 píxeles
+    texto = 'Temperatura 36.5'
+    for rotate in (0, 90, 180, 270):
+        girar = medir(lambda: ili9341.rotate565(sprite, 64, 64, rotate), 20)
+        dibujar = medir(lambda: d.draw_sprite(sprite, 80, 80, 64, 64,
+                                              rotate), 20)
+        escrituras = spi.writes
+
+        def columna():
+            # Renglones en la misma columna: la ventana de columnas se
+            # reutiliza entre bloques
+            for i in range(8):
+                if rotate in (90, 270):
+                    d.draw_text8x8(10 + i * 10, 10, texto, 0xFFFF, 0, rotate)
+                else:
+                    d.draw_text8x8(10, 10 + i * 10, texto, 0xFFFF, 0, rotate)
+
+        textos = medir(columna, 10)
+        print('rotaciones: %3d° rotate565 %6d us, draw_sprite %6d us, '
+              '8 textos %6d us, %5.1f escrituras SPI por texto'
+              % (rotate, girar, dibujar, textos,
+                 (spi.writes - escrituras) / 80))
+
+
+def widgets():
+    """Bytes por cuadro del árbol de widgets según lo que cambia."""
+    from widgets import Screen, Panel, LineChart, Gauge, StatusBar
+    d, spi = pantalla(ContadorSPI(), width=320, height=240)
+    raiz = Screen(d, 0xFFFF)
+    panel = raiz.add(Panel(10, 10, 300, 100, 0xE71C, 0x03DB,
+                           'Temperatura'))
+    # Serie corta que cambia completa: LineChart la redibuja entera
+    grafica = panel.add(LineChart(20, 30, 280, 70, 0x03DB, 0xE71C,
+                                  [36 + i % 3 for i in range(12)]))
+    medidor = raiz.add(Gauge(120, 130, 80, 0x03DB, 0, 0xFFFF, 100,
+                             'Nivel'))
+    barra = raiz.add(StatusBar(0, 220, 320, 20, 0xE71C))
+    lectura = barra.add_label(10, 14, 0)
+    cuadros = (('inicial', None),
+               ('sin cambios', lambda: None),
+               ('etiqueta', lambda: lectura.set_text('Lectura: 57%')),
+               ('medidor', lambda: medidor.set_value(57)),
+               ('serie', lambda: grafica.set_values(
+                   [37 + i % 4 for i in range(12)])))
+    for nombre, cambio in cuadros:
+        if cambio is not None:
+            cambio()
+        escrituras = spi.writes
+        enviados = raiz.render()
+        print('widgets: %-12s %6d bytes, %4d bloques, %5d escrituras SPI'
+              % (nombre, enviados, raiz.frame_blocks,
+                 spi.writes - escrituras))
+
+
+def tareas():
+    """Queue, periodic y report de tareas.py con el asyncio del intérprete."""
+    import tareas as t
+    cola = t.Queue(4)
+    for i in range(6):
+        cola.put_nowait(i)
+    assert cola.dropped == 2 and cola.get_nowait() == 2
+    assert cola.latest() == 5 and cola.get_nowait() is None
+    rapida = t.TaskStats('rapida', 10)
+    lenta = t.TaskStats('lenta', 50)
+    recibidos = []
+
+    def productor():
+        cola.put_nowait(rapida.runs)
+
+    async def consumidor():
+        while True:
+            recibidos.append(await cola.get())
+
+    async def correr(corrutinas, ms):
+        # Corre las corrutinas como tareas durante ms y las cancela
+        corriendo = [t.asyncio.create_task(c) for c in corrutinas]
+        await t.sleep_ms(ms)
+        for tarea in corriendo:
+            tarea.cancel()
+        await t.sleep_ms(0)
+
+    t.asyncio.run(correr([t.periodic(rapida, productor),
+                          t.periodic(lenta, lambda: None), consumidor()], 300))
+    for stats in (rapida, lenta):
+        print('tareas:', stats.report())
+    # Sin deriva: el número de ejecuciones sigue al periodo
+    assert 20 <= rapida.runs <= 31 and 4 <= lenta.runs <= 7
+    assert recibidos == list(range(len(recibidos))) and cola.dropped == 2
+    impresos = []
+    t.print = impresos.append  # Captura lo que imprime report()
+    try:
+        t.asyncio.run(correr([t.report([rapida], 20)], 50))
+    finally:
+        del t.print
+    assert len(impresos) == 2 and rapida.runs == 0
+    print('tareas: Queue, periodic y report ok')
+
+
+def alarmas():
+    """Prioridad y desplazamiento de alarmas con el asyncio del intérprete."""
+    import alarmas as a
+
+    class Buzzer(object):
+        # PWM simulado: guarda la frecuencia mientras suena
+        def __init__(self):
+            self.f = 0
+            self.sonando = []
+
+        def freq(self, f):
+            self.f = f
+
+        def duty(self, d):
+            if d:
+                self.sonando.append(self.f)
+
+    buzzer = Buzzer()
+    led = Pin(0)
+    motor = a.AlarmEngine(buzzer, led)
+    motor.define('temp', 1, (40, 40), freq=1000, pause=100)
+    motor.define('hr', 2, (20, 20, 20, 20), freq=3000, pause=100)
+
+    async def principal():
+        tarea = a.asyncio.create_task(motor.run())
+        motor.start('temp')
+        await a.asyncio.sleep(0.02)
+        assert buzzer.sonando[-1] == 1000 and led() == 1
+        # hr desplaza a temp a media nota, sin esperar a que termine
+        motor.start('hr', severity=1)
+        await a.asyncio.sleep(0.005)
+        assert motor.current == 'hr' and buzzer.sonando[-1] == 3000
+        motor.start('temp', severity=2)  # Menor prioridad: no desplaza
+        await a.asyncio.sleep(0.005)
+        assert motor.current == 'hr'
+        motor.stop('hr')
+        await a.asyncio.sleep(0.005)
+        assert motor.current == 'temp' and buzzer.sonando[-1] == 1000
+        motor.update({})
+        await a.asyncio.sleep(0.005)
+        assert motor.current is None and led() == 0
+        tarea.cancel()
+        await a.asyncio.sleep(0)
+
+    a.asyncio.run(principal())
+    print('alarmas: prioridad y desplazamiento ok, %d notas'
+          % len(buzzer.sonando))
+
+
+def vitales():
+    """Bytes por cuadro de la vista de signos vitales en memoria."""
+    from display_backend import MemoryBackend, TextLines
+    panel = MemoryBackend(128, 64)
+    vista = TextLines(panel, 4)
+    completo = panel.width * panel.height * 2
+    # Mismos renglones que Biometricos.update_display
+    cuadros = (('inicial', 36.5, 72, 98, '*valor simulado'),
+               ('sin cambios', 36.5, 72, 98, '*valor simulado'),
+               ('cambia HR', 36.5, 75, 98, '*valor simulado'),
+               ('alerta', 38.2, 75, 97, 'ALERTA!'))
+    for nombre, temp, hr, spo2, aviso in cuadros:
+        bloques = panel.blocks_written
+        enviados = panel.bytes_written
+        vista.set(0, "Temp: {:.1f} C".format(temp))
+        vista.set(1, "HR: {} BPM".format(hr))
+        vista.set(2, "SpO2: {}%*".format(spo2))
+        vista.set(3, aviso)
+        vista.show()
+        print('vitales: %-12s %2d bloques, %5d bytes (pantalla completa %d)'
+              % (nombre, panel.blocks_written - bloques,
+                 panel.bytes_written - enviados, completo))
+    # El texto llegó al búfer: algún píxel del primer renglón encendido
+    assert any(panel.pixel(x, y) for x in range(128) for y in range(8))
+
+
+SECCIONES = {
+    'lineas': lineas,
+    'buffer': buffer,
+    'asignaciones': asignaciones,
+    'cola': cola,
+    'imagenes': imagenes,
+    'fuentes': fuentes,
+    'tactil': tactil,
+    'figuras': figuras,
+    'rotaciones': rotaciones,
+    'widgets': widgets,
+    'tareas': tareas,
+    'alarmas': alarmas,
+    'vitales': vitales,
+}
+
+
+if __name__ == '__main__':
+    nombres = sys.argv[1:] or list(SECCIONES)
+    for nombre in nombres:
+        SECCIONES[nombre]()
@@ -0,0 +1,599 @@
+"""
+Muestreo del sensor de pulso KY-039 a frecuencia fija.
+
+Un Timer de hardware lee el ADC con read_u16() y guarda cada valor, con
+su marca de tiempo en microsegundos, en un anillo preasignado de
+array('H'). El bucle principal consume bloques completos con
+read_block(), así la adquisición no depende de lo que tarde el resto
+del programa. BeatDetector filtra la señal y calcula el BPM a partir
+de los latidos; sus estadísticas de la señal cruda salen de un
+SampleRing, que las mantiene con costo constante por muestra.
+
+En la PC (o con el puerto unix de MicroPython) se puede medir la
+precisión y la velocidad del detector con trazos sintéticos o grabados:
+
+    python pulso.py [traza.csv [frecuencia]]
+"""
+import math
+import random
+from array import array
+try:
+    from time import ticks_diff, ticks_us
+except ImportError:  # CPython en la PC
+    from time import perf_counter_ns
+
+    def ticks_us():
+        return perf_counter_ns() // 1000
+
+    def ticks_diff(a, b):
+        return a - b
+
+
+class BeatDetector(object):
+    """Detector de latidos en tiempo real para una señal PPG.
+
+    Cada muestra pasa por:
+
+    1. Remoción de DC: se resta un promedio exponencial lento, que actúa
+       como pasa-altas de ~0.5 Hz.
+    2. Pasa-bajas de ~4 Hz: dos promedios exponenciales en cascada.
+    3. Búsqueda de picos: máximos locales de la señal filtrada, medidos
+       desde el valle anterior para no depender de la línea base.
+    4. Umbral adaptativo: a medio camino entre el nivel de los picos de
+       latido y el de los picos de ruido, ambos promediados, con un
+       periodo refractario que crece con el intervalo típico.
+    5. BPM: mediana de los últimos intervalos entre latidos (IBI), con un
+       índice de calidad según qué tan regulares son.
+
+    Un pico necesita además una altura mínima absoluta y al menos 3/5 del
+    ruido blanco estimado con la segunda diferencia de la señal cruda (el
+    pulso, lento, casi no aporta a ella), y bpm se reporta en 0 mientras la
+    calidad no llegue a MIN_QUALITY: sin dedo en el sensor el ruido no
+    produce un ritmo.
+
+    La señal cruda pasa por un SampleRing: su derivada da la segunda
+    diferencia, su mínimo y máximo de la ventana detectan la saturación
+    del ADC, y su media y varianza dan el índice de perfusión (AC/DC) de
+    cada latido.
+
+    Todo es aritmética entera en punto fijo (Q8) sobre arreglos
+    preasignados, así que process() no asigna memoria salvo al contar un
+    latido.
+    """
+
+    IBI_MIN = 250  # ms, 240 BPM
+    IBI_MAX = 2000  # ms, 30 BPM
+    LOST_MS = 3000  # Sin latidos en este tiempo se reinicia la estimación
+    RAIL = 4090  # Muestras de 12 bits a partir de aquí están saturadas
+    MIN_QUALITY = 60  # Calidad mínima para reportar bpm
+
+    def __init__(self, rate=200, intervals=5, refractory=250, shift=4,
+                 invert=False, min_amplitude=4, window=None):
+        """Inicializa el detector.
+
+        Args:
+            rate (int): Muestras por segundo.
+            intervals (int): Intervalos para la mediana del BPM.
+            refractory (int): Mínimo de ms entre latidos.
+            shift (int): Bits a descartar para llevar las muestras a 12
+                bits (4 para read_u16()).
+            invert (bool): True si el latido baja la señal en vez de
+                subirla.
+            min_amplitude (int): Altura mínima de un latido, de valle a
+                pico, en cuentas de 12 bits de la señal filtrada.
+            window (int): Muestras crudas para la saturación y la
+                perfusión (por defecto 1 s, como máximo WINDOW_MAX).
+        """
+        self.shift = shift
+        self.invert = invert
+        self.refractory = refractory
+        self.min_peak = min_amplitude << 8  # Q8
+        # Corrimientos de los filtros: alfa ~ 2*pi*fc/rate
+        self.dc_shift = self.filter_shift(rate, 0.5)
+        self.lp_shift = self.filter_shift(rate, 4)
+        self.ibis = array('H', [0] * intervals)  # Anillo de intervalos
+        self.sorted_ibis = array('H', [0] * intervals)  # Para la mediana
+        window = min(window or rate, SampleRing.WINDOW_MAX)
+        size = 2
+        while size <= window:
+            size <<= 1
+        self.raw = SampleRing(size, window)  # Muestras crudas de 12 bits
+        self.reset()
+
+    def filter_shift(self, rate, cutoff):
+        # Corrimiento k tal que 1/2**k se acerca a 2*pi*cutoff/rate
+        k = 0
+        while (1 << (k + 1)) * 6.2832 * cutoff <= rate * 1.41:
+            k += 1
+        return k
+
+    def median(self):
+        # Ordenamiento por inserción de una copia de los intervalos
+        n = self.ibi_count
+        s = self.sorted_ibis
+        src = self.ibis
+        for i in range(n):
+            v = src[i]
+            j = i
+            while j and s[j - 1] > v:
+                s[j] = s[j - 1]
+                j -= 1
+            s[j] = v
+        return s[n >> 1]
+
+    def peak(self, p, t):
+        """Clasifica un máximo local como latido o ruido.
+
+        Args:
+            p (int): Altura del pico sobre el valle anterior (Q8).
+            t (int): ticks_us() del pico.
+        Returns:
+            bool: True si es un latido.
+        """
+        since = ticks_diff(t, self.last_beat) // 1000 if self.beats else -1
+        if (p <= self.threshold or p < self.min_peak or
+                p * 5 < self.hf_noise * 3 or 0 <= since < self.min_gap):
+            self.noise_level += (p - self.noise_level) >> 3
+            self.update_threshold()
+            return False
+        # Aprende rápido los primeros latidos
+        self.signal_level += (p - self.signal_level) >> (
+            1 if self.beats < 4 else 3)
+        self.update_threshold()
+        self.beats += 1
+        self.last_beat = t
+        self.update_perfusion()
+        if self.IBI_MIN <= since <= self.IBI_MAX:
+            n = len(self.ibis)
+            self.ibis[self.ibi_head] = since
+            self.ibi_head = (self.ibi_head + 1) % n
+            if self.ibi_count < n:
+                self.ibi_count += 1
+            med = self.median()
+            self.min_gap = max(self.refractory, med // 2)
+            self.update_quality(med)
+            if self.quality >= self.MIN_QUALITY:
+                self.bpm = (60000 + (med >> 1)) // med
+            else:
+                self.bpm = 0
+        return True
+
+    def process(self, value, t):
+        """Procesa una muestra de 12 bits.
+
+        Args:
+            value (int): Muestra del ADC ya en 12 bits.
+            t (int): ticks_us() de la muestra.
+        Returns:
+            bool: True si la muestra anterior fue el pico de un latido.
+        """
+        raw = self.raw
+        raw.push(value)
+        x = value << 8
+        if self.dc is None:
+            self.dc = x
+        # Ruido blanco: promedio de la segunda diferencia de la señal cruda
+        d = raw.derivative
+        self.hf_noise += ((abs(d - self.d1) << 8) - self.hf_noise) >> 5
+        self.d1 = d
+        self.dc += (x - self.dc) >> self.dc_shift
+        y = x - self.dc
+        if self.invert:
+            y = -y
+        lp1 = self.lp1 + ((y - self.lp1) >> self.lp_shift)
+        lp2 = self.lp2 + ((lp1 - self.lp2) >> self.lp_shift)
+        self.lp1 = lp1
+        y1 = self.lp2
+        self.lp2 = lp2
+        beat = False
+        if y1 < self.trough:
+            self.trough = y1
+        if y1 > self.y2 and y1 >= lp2:
+            beat = self.peak(y1 - self.trough, self.t1)
+            self.trough = y1
+        elif self.beats and ticks_diff(t, self.last_beat) > self.LOST_MS * 1000:
+            self.lost()
+        self.y2 = y1
+        self.t1 = t
+        return beat
+
+    def process_block(self, values, times, n):
+        """Procesa n muestras leídas con PulseSampler.read_block().
+
+        Returns:
+            int: Latidos detectados en el bloque.
+        """
+        shift = self.shift
+        process = self.process
+        beats = 0
+        for k in range(n):
+            if process(values[k] >> shift, times[k]):
+                beats += 1
+        return beats
+
+    def lost(self):
+        # Sin latidos: se olvida el BPM y se baja el nivel de señal para
+        # volver a enganchar una señal más débil
+        self.beats = 0
+        self.ibi_count = 0
+        self.ibi_head = 0
+        self.bpm = 0
+        self.quality = 0
+        self.min_gap = self.refractory
+        self.signal_level >>= 1
+        self.update_threshold()
+
+    def reset(self):
+        """Reinicia los filtros y la estimación."""
+        self.dc = None
+        self.lp1 = self.lp2 = 0
+        self.y2 = 0  # Salida filtrada de dos muestras atrás
+        self.trough = 0  # Mínimo de la salida desde el último pico
+        self.t1 = 0  # ticks_us() de la muestra anterior
+        self.signal_level = 0  # Nivel promedio de los picos de latido (Q8)
+        self.noise_level = 0  # Nivel promedio de los picos de ruido (Q8)
+        self.hf_noise = 0  # Promedio de la segunda diferencia cruda (Q8)
+        self.d1 = 0  # Derivada cruda de la muestra anterior
+        self.raw.clear()
+        self.threshold = 0
+        self.beats = 0
+        self.last_beat = 0
+        self.ibi_count = 0
+        self.ibi_head = 0
+        self.min_gap = self.refractory
+        self.bpm = 0  # 0 mientras no hay estimación confiable
+        self.quality = 0  # Índice de calidad de la señal, 0 a 100
+        self.perfusion = 0  # Índice de perfusión del último latido, en ‰
+
+    def update_perfusion(self):
+        # AC/DC de la ventana cruda; la amplitud AC se estima como 2*√2
+        # desviaciones estándar (pico a pico de una senoidal), que a
+        # diferencia de máximo - mínimo no cambia con una muestra suelta
+        mean = self.raw.mean()
+        if mean:
+            ac = math.sqrt(8 * self.raw.variance())
+            self.perfusion = int(1000 * ac) // mean
+
+    def update_quality(self, med):
+        # Porcentaje de intervalos a menos de 1/6 de la mediana, sobre el
+        # total de la ventana; la mitad si en la ventana cruda la señal
+        # tocó un extremo del ADC
+        tol = med // 6
+        good = 0
+        for i in range(self.ibi_count):
+            if abs(self.ibis[i] - med) <= tol:
+                good += 1
+        quality = 100 * good // len(self.ibis)
+        raw = self.raw
+        if raw.maximum() >= self.RAIL or raw.minimum() <= 4095 - self.RAIL:
+            quality >>= 1
+        self.quality = quality
+
+    def update_threshold(self):
+        self.threshold = self.noise_level + (
+            (self.signal_level - self.noise_level) >> 1)
+
+
+class PulseSampler(object):
+    """Anillo de muestras del ADC llenado desde un Timer.
+
+    El callback del Timer solo escribe en arreglos preasignados y mueve
+    head; el consumidor solo mueve tail, así que no hace falta bloquear
+    interrupciones. Si el anillo se llena, las muestras nuevas se
+    descartan y se cuentan en overruns.
+    """
+
+    def __init__(self, adc, rate=200, size=512):
+        """Inicializa el muestreador.
+
+        Args:
+            adc (Class ADC): Entrada analógica del sensor.
+            rate (int): Muestras por segundo (100 a 250 para el pulso).
+            size (int): Capacidad del anillo, potencia de 2.
+        """
+        if size & (size - 1):
+            raise ValueError('size debe ser potencia de 2')
+        self.read = adc.read_u16
+        self.rate = rate
+        self.size = size
+        self.mask = size - 1
+        self.values = array('H', [0] * size)  # Lecturas de 16 bits
+        self.times = array('L', [0] * size)  # ticks_us() de cada una
+        self.head = 0  # Próxima posición a escribir (solo el Timer)
+        self.tail = 0  # Próxima posición a leer (solo el consumidor)
+        self.overruns = 0  # Muestras perdidas por anillo lleno
+        self.timer = None
+
+    def available(self):
+        """Regresa el número de muestras pendientes de leer."""
+        return (self.head - self.tail) & self.mask
+
+    def read_block(self, values, times=None):
+        """Copia las muestras pendientes a los arreglos dados.
+
+        Args:
+            values (array): Destino de las lecturas, su largo es el
+                máximo de muestras a copiar.
+            times (array): Destino opcional de las marcas ticks_us().
+        Returns:
+            int: Muestras copiadas.
+        """
+        n = min(self.available(), len(values))
+        src = self.values
+        src_t = self.times
+        mask = self.mask
+        i = self.tail
+        for k in range(n):
+            values[k] = src[i]
+            if times is not None:
+                times[k] = src_t[i]
+            i = (i + 1) & mask
+        self.tail = i
+        return n
+
+    def sample(self, timer=None):
+        """Toma una muestra; es el callback del Timer (sin asignar memoria)."""
+        i = self.head
+        nxt = (i + 1) & self.mask
+        if nxt == self.tail:
+            self.overruns += 1
+            return
+        self.values[i] = self.read()
+        self.times[i] = ticks_us()
+        self.head = nxt
+
+    def start(self, timer):
+        """Empieza a muestrear con un Timer periódico.
+
+        Args:
+            timer (Class Timer): Timer a usar.
+        Note:
+            En el ESP32 los callbacks del Timer son interrupciones suaves,
+            así que pueden retrasarse mientras el intérprete está en una
+            llamada larga; las marcas de tiempo guardan el instante real
+            de cada muestra.
+        """
+        self.timer = timer
+        timer.init(freq=self.rate, mode=timer.PERIODIC, callback=self.sample)
+
+    def stop(self):
+        """Detiene el muestreo iniciado con start()."""
+        if self.timer is not None:
+            self.timer.deinit()
+            self.timer = None
+
+
+class SampleRing(object):
+    """Historial circular de muestras con estadísticas incrementales.
+
+    Sobre las últimas window muestras mantiene la suma y la suma de
+    cuadrados (media y varianza), el mínimo y el máximo con colas
+    monótonas, y la primera derivada. Cada push() cuesta O(1) amortizado
+    y no asigna memoria.
+
+    Note:
+        Las sumas se llevan respecto a OFFSET, la mitad de la escala de
+        12 bits, así que con window <= WINDOW_MAX caben en enteros
+        pequeños de MicroPython.
+    """
+
+    OFFSET = 2048  # Centro de la escala de 12 bits
+    WINDOW_MAX = 255  # 255 * 2048**2 < 2**30
+
+    def __init__(self, size=512, window=20):
+        """Inicializa el historial.
+
+        Args:
+            size (int): Muestras guardadas, potencia de 2 mayor que window.
+            window (int): Muestras de la ventana de estadísticas, hasta
+                WINDOW_MAX.
+        """
+        if size & (size - 1) or size <= window:
+            raise ValueError('size debe ser potencia de 2 mayor que window')
+        if not 0 < window <= self.WINDOW_MAX:
+            raise ValueError('window debe estar entre 1 y WINDOW_MAX')
+        self.size = size
+        self.mask = size - 1
+        self.window = window
+        self.values = array('H', [0] * size)
+        # Colas monótonas de posiciones: valores decrecientes en max_q y
+        # crecientes en min_q; el frente es el máximo o mínimo
+        self.max_q = array('H', [0] * (window + 1))
+        self.min_q = array('H', [0] * (window + 1))
+        self.clear()
+
+    def __getitem__(self, k):
+        """Regresa la k-ésima muestra más reciente (0 es la última)."""
+        if not 0 <= k < self.count:
+            raise IndexError('muestra fuera del historial')
+        return self.values[(self.head - 1 - k) & self.mask]
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """Vacía el historial y sus estadísticas."""
+        self.head = 0  # Próxima posición a escribir
+        self.count = 0  # Muestras guardadas (hasta size)
+        self.total = 0  # Suma de la ventana, respecto a OFFSET
+        self.squares = 0  # Suma de cuadrados de la ventana, respecto a OFFSET
+        self.derivative = 0  # Última muestra menos la anterior
+        self.max_head = self.max_len = 0
+        self.min_head = self.min_len = 0
+
+    def maximum(self):
+        """Regresa el máximo de la ventana (0 si está vacía)."""
+        if not self.count:
+            return 0
+        return self.values[self.max_q[self.max_head]]
+
+    def mean(self):
+        """Regresa la media entera de la ventana (0 si está vacía)."""
+        if not self.count:
+            return 0
+        return self.OFFSET + self.total // min(self.count, self.window)
+
+    def minimum(self):
+        """Regresa el mínimo de la ventana (0 si está vacía)."""
+        if not self.count:
+            return 0
+        return self.values[self.min_q[self.min_head]]
+
+    def push(self, value):
+        """Agrega una muestra y actualiza las estadísticas."""
+        values = self.values
+        mask = self.mask
+        window = self.window
+        i = self.head
+        if self.count >= window:
+            # La muestra que sale de la ventana
+            old = values[(i - window) & mask] - self.OFFSET
+            self.total -= old
+            self.squares -= old * old
+        self.derivative = value - values[(i - 1) & mask] if self.count else 0
+        values[i] = value
+        v = value - self.OFFSET
+        self.total += v
+        self.squares += v * v
+        self.head = (i + 1) & mask
+        if self.count < self.size:
+            self.count += 1
+        self.max_head, self.max_len = self.queue_push(
+            self.max_q, self.max_head, self.max_len, i, True)
+        self.min_head, self.min_len = self.queue_push(
+            self.min_q, self.min_head, self.min_len, i, False)
+
+    def queue_push(self, q, head, length, i, greater):
+        # Quita del final las posiciones dominadas por la nueva muestra,
+        # la agrega y descarta del frente las que salieron de la ventana
+        values = self.values
+        mask = self.mask
+        cap = len(q)
+        value = values[i]
+        while length:
+            last = values[q[(head + length - 1) % cap]]
+            if (last > value) if greater else (last < value):
+                break
+            length -= 1
+        q[(head + length) % cap] = i
+        length += 1
+        while (i - q[head]) & mask >= self.window:
+            head = (head + 1) % cap
+            length -= 1
+        return head, length
+
+    def variance(self):
+        """Regresa la varianza entera de la ventana (0 si está vacía)."""
+        if not self.count:
+            return 0
+        n = min(self.count, self.window)
+        mean = self.total // n
+        return max(0, self.squares // n - mean * mean)
+
+
+def synthetic_ppg(bpm, seconds, rate=200, amplitude=300, noise=20,
+                  wander=150, seed=1):
+    """Genera un trazo PPG sintético con la escala de read_u16().
+
+    Cada latido tiene una onda sistólica y una dicrótica menor, sobre
+    una línea base que deriva lentamente y con ruido uniforme.
+
+    Args:
+        bpm (int): Ritmo del trazo.
+        seconds (int): Duración.
+        rate (int): Muestras por segundo.
+        amplitude (int): Altura de la onda sistólica en cuentas de 12 bits.
+        noise (int): Amplitud del ruido en cuentas de 12 bits.
+        wander (int): Amplitud de la deriva de la línea base.
+        seed (int): Semilla del ruido.
+    Returns:
+        tuple: (valores array('H'), tiempos array('L') en µs)
+    """
+    random.seed(seed)
+    n = int(seconds * rate)
+    values = array('H', [0] * n)
+    times = array('L', [0] * n)
+    for i in range(n):
+        t = i / rate
+        phase = (t * bpm / 60) % 1
+        v = (2048 + wander * math.sin(2 * math.pi * 0.2 * t) +
+             amplitude * math.exp(-((phase - 0.15) / 0.06) ** 2) +
+             amplitude * 0.35 * math.exp(-((phase - 0.45) / 0.08) ** 2) +
+             noise * (random.getrandbits(10) / 512 - 1))
+        values[i] = max(0, min(4095, int(v))) << 4
+        times[i] = i * 1000000 // rate
+    return values, times
+
+
+def benchmark(values, times, rate=200, expected=None, block=32):
+    """Corre el detector sobre un trazo y reporta velocidad y precisión.
+
+    El error se mide una vez por segundo, después de los primeros 5 s.
+
+    Returns:
+        tuple: (bpm final, calidad, error medio en BPM o None,
+        muestras por segundo)
+    """
+    det = BeatDetector(rate)
+    n = len(values)
+    errors = 0
+    checks = 0
+    start = ticks_us()
+    for i in range(0, n, block):
+        k = min(block, n - i)
+        det.process_block(values[i:i + k], times[i:i + k], k)
+        if expected is not None and i >= 5 * rate and i % rate < block:
+            errors += abs(det.bpm - expected)
+            checks += 1
+    elapsed = max(ticks_diff(ticks_us(), start), 1)
+    error = errors / checks if checks else None
+    return det.bpm, det.quality, error, n * 1000000 // elapsed
+
+
+def load_trace(path):
+    """Lee un trazo grabado: una muestra read_u16() por línea, o
+    'tiempo_us,valor'. Sin tiempos se supone la frecuencia de
+    muestreo dada en la línea de comandos."""
+    values = array('H')
+    times = array('L')
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line[0] == '#':
+                continue
+            parts = line.split(',')
+            values.append(int(parts[-1]))
+            times.append(int(parts[0]) if len(parts) > 1 else 0)
+    return values, times
+
+
+if __name__ == '__main__':
+    # Uso en la PC o con el puerto unix de MicroPython:
+    #     python pulso.py                      (trazos sintéticos)
+    #     python pulso.py traza.csv [frecuencia]
+    import sys
+    if len(sys.argv) > 1:
+        rate = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+        values, times = load_trace(sys.argv[1])
+        if not times[-1]:
+            for i in range(len(times)):
+                times[i] = i * 1000000 // rate
+        bpm, quality, _, speed = benchmark(values, times, rate)
+        print('%s: %d BPM, calidad %d%%, %d muestras/s' %
+              (sys.argv[1], bpm, quality, speed))
+    else:
+        # (ritmo, amplitud, ruido, deriva); amplitud 0 o por debajo de
+        # min_amplitude es el sensor sin dedo: se espera 0 BPM
+        for bpm, amplitude, noise, wander in (
+                (50, 300, 20, 150), (72, 300, 20, 150), (120, 300, 20, 150),
+                (180, 300, 20, 150), (72, 300, 80, 300), (72, 300, 150, 600),
+                (72, 0, 5, 0), (72, 0, 20, 150), (72, 0, 80, 300),
+                (72, 0, 150, 600), (72, 5, 40, 150)):
+            values, times = synthetic_ppg(bpm, 60, amplitude=amplitude,
+                                          noise=noise, wander=wander)
+            expected = bpm if amplitude >= 2 * noise else 0
+            got, quality, error, speed = benchmark(values, times,
+                                                   expected=expected)
+            print('esperado %3d BPM, amplitud %3d, ruido %3d: %3d BPM, '
+                  'error medio %5.1f, calidad %3d%%, %d muestras/s' %
+                  (expected, amplitude, noise, got, error, quality, speed))
@@ -3,15 +3,41 @@
 from micropython import const
 import framebuf
 import time
+from display_backend import DisplayBackend
 # Dirección del OLED: 0x3C por defecto
-class SSD1306_I2C(framebuf.FrameBuffer):
-    def init(self, width, height, i2c, addr=0x3C):
+class SSD1306_I2C(DisplayBackend):
+    FORMAT = framebuf.MONO_VLSB
+    def __init__(self, width, height, i2c, addr=0x3C):
         self.width = width
         self.height = height
         self.i2c = i2c
         self.addr = addr
         self.buffer = bytearray(self.height * self.width // 8)
-        super().init(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
+        self.dirty = []  # Regiones escritas con block() pendientes de flush()
+        self.pages = self.height // 8
+        self.shadow = bytearray(len(self.buffer))  # Último cuadro enviado
+        self.full = True  # El próximo show() envía la pantalla completa
+        self.bytes_written = 0  # Bytes de píxeles enviados por I2C
+        # Búferes preasignados para que show() no reserve memoria
+        self.cmd_buf = bytearray(2)
+        self.cmd_buf[0] = 0x80
+        # Control 0x00 + ventana de columnas (0x21) y de páginas (0x22)
+        self.window_buf = bytearray(b'\x00\x21\x00\x00\x22\x00\x00')
+        self.data_vec = [b'\x40', None]
+        # Métodos de dibujo de framebuf sobre el búfer, como en el original
+        fb = framebuf.FrameBuffer(self.buffer, self.width, self.height,
+                                  framebuf.MONO_VLSB)
+        self.framebuf = fb
+        self.fill = fb.fill
+        self.pixel = fb.pixel
+        self.hline = fb.hline
+        self.vline = fb.vline
+        self.line = fb.line
+        self.rect = fb.rect
+        self.fill_rect = fb.fill_rect
+        self.text = fb.text
+        self.scroll = fb.scroll
+        self.blit = fb.blit
         self.init_display()
     def init_display(self):
         for cmd in (
@@ -19,10 +45,63 @@ class SSD1306_I2C(framebuf.FrameBuffer):
             0x14, 0x20, 0x00, 0xA1, 0xC8, 0xDA, 0x12, 0x81, 0xCF, 0xD9,
             0xF1, 0xDB, 0x40, 0xA6, 0xAF):
             self.write_cmd(cmd)
+        self.full = True  # La RAM del panel no coincide con la sombra
         self.fill(0)
         self.show()
+    def block(self, x0, y0, x1, y1, data):
+        # data en MONO_VLSB (páginas de 8 filas), como lo deja framebuf
+        src = framebuf.FrameBuffer(data, x1 - x0 + 1, y1 - y0 + 1,
+                                   framebuf.MONO_VLSB)
+        self.framebuf.blit(src, x0, y0)
+        self.mark_dirty(x0, y0, x1, y1)
+    def buffer_size(self, w, h):
+        return w * ((h + 7) // 8)
+    def flush(self):
+        if self.dirty:
+            self.show()
+    def native_color(self, color):
+        return 1 if color else 0
     def write_cmd(self, cmd):
-        self.i2c.writeto(self.addr, bytearray([0x80, cmd]))
+        self.cmd_buf[1] = cmd
+        self.i2c.writeto(self.addr, self.cmd_buf)
+    def write_window(self, c0, c1, p0, p1, data):
+        # Fija la ventana de columnas y páginas y envía sus datos; con el
+        # direccionamiento horizontal el panel recorre la ventana solo
+        wb = self.window_buf
+        wb[2] = c0
+        wb[3] = c1
+        wb[5] = p0
+        wb[6] = p1
+        self.i2c.writeto(self.addr, wb)
+        vec = self.data_vec
+        vec[1] = data
+        self.i2c.writevto(self.addr, vec)
+        vec[1] = None
+        self.bytes_written += len(data)
     def show(self):
-        self.i2c.writeto(self.addr, bytearray([0x40]) + self.buffer)
-
+        # Compara cada página con el último cuadro enviado y manda solo
+        # el rango de columnas que cambió
+        buf = memoryview(self.buffer)
+        shadow = self.shadow
+        w = self.width
+        if self.full:
+            self.write_window(0, w - 1, 0, self.pages - 1, buf)
+            shadow[:] = buf
+            self.full = False
+        else:
+            start = 0
+            for page in range(self.pages):
+                end = start + w
+                c0 = start
+                while c0 < end and buf[c0] == shadow[c0]:
+                    c0 += 1
+                if c0 < end:
+                    c1 = end - 1
+                    while buf[c1] == shadow[c1]:
+                        c1 -= 1
+                    c1 += 1
+                    self.write_window(c0 - start, c1 - start - 1, page, page,
+                                      buf[c0:c1])
+                    shadow[c0:c1] = buf[c0:c1]
+                start = end
+        self.dirty = []
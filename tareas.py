@@ -0,0 +1,169 @@
+"""
+Utilidades para repartir el firmware en tareas de uasyncio.
+
+- Queue: cola acotada entre tareas; si se llena descarta lo más viejo,
+  así un consumidor lento nunca frena al productor. latest() da solo la
+  lectura más nueva a quien no necesita las intermedias.
+- TaskStats: cuántas veces corrió una tarea, cuánto tardó y con cuánto
+  retraso arrancó respecto a su periodo.
+- periodic(): corre una función cada period_ms sin acumular deriva y
+  midiendo sus estadísticas.
+"""
+from collections import deque
+try:
+    from time import ticks_add, ticks_diff, ticks_ms, ticks_us
+except ImportError:  # CPython en la PC
+    from time import perf_counter_ns
+
+    def ticks_us():
+        return perf_counter_ns() // 1000
+
+    def ticks_ms():
+        return perf_counter_ns() // 1000000
+
+    def ticks_add(a, b):
+        return a + b
+
+    def ticks_diff(a, b):
+        return a - b
+try:
+    import uasyncio as asyncio
+    sleep_ms = asyncio.sleep_ms
+except ImportError:  # asyncio de CPython no tiene sleep_ms
+    import asyncio
+
+    def sleep_ms(ms):
+        return asyncio.sleep(ms / 1000)
+
+
+class Queue(object):
+    """Cola FIFO acotada para pasar datos entre tareas."""
+
+    def __init__(self, size=8):
+        """Inicializa la cola.
+
+        Args:
+            size (int): Elementos máximos; al llenarse se descarta el
+                más viejo.
+        """
+        self.items = deque((), size)
+        self.size = size
+        self.event = asyncio.Event()
+        self.dropped = 0  # Elementos descartados por cola llena
+
+    def __len__(self):
+        return len(self.items)
+
+    async def get(self):
+        """Espera y regresa el siguiente elemento."""
+        while not self.items:
+            self.event.clear()
+            await self.event.wait()
+        return self.items.popleft()
+
+    def get_nowait(self):
+        """Regresa el siguiente elemento o None si la cola está vacía."""
+        return self.items.popleft() if self.items else None
+
+    def latest(self):
+        """Vacía la cola y regresa el elemento más nuevo, o None."""
+        item = None
+        while self.items:
+            item = self.items.popleft()
+        return item
+
+    def put_nowait(self, item):
+        """Agrega un elemento sin esperar."""
+        if len(self.items) >= self.size:
+            self.items.popleft()
+            self.dropped += 1
+        self.items.append(item)
+        self.event.set()
+
+
+class TaskStats(object):
+    """Estadísticas de ejecución de una tarea."""
+
+    def __init__(self, name, period=0):
+        """Inicializa las estadísticas.
+
+        Args:
+            name (str): Nombre para el reporte.
+            period (int): Periodo esperado en ms (0 si espera eventos).
+        """
+        self.name = name
+        self.period = period
+        self.reset()
+
+    def end(self, start):
+        """Registra una ejecución que empezó en ticks_us() start."""
+        elapsed = ticks_diff(ticks_us(), start)
+        self.runs += 1
+        self.total_us += elapsed
+        if elapsed > self.max_us:
+            self.max_us = elapsed
+
+    def late(self, ms):
+        """Registra con cuántos ms de retraso arrancó la ejecución."""
+        if ms > self.max_late:
+            self.max_late = ms
+
+    def report(self):
+        """Regresa una línea con las estadísticas desde el último reset."""
+        avg = self.total_us // self.runs if self.runs else 0
+        return ('%-8s %6d veces  prom %6d us  max %7d us  retraso max %5d ms'
+                '  errores %d' % (self.name, self.runs, avg, self.max_us,
+                                  self.max_late, self.errors))
+
+    def reset(self):
+        self.runs = 0
+        self.total_us = 0
+        self.max_us = 0
+        self.max_late = 0
+        self.errors = 0
+
+
+async def periodic(stats, func):
+    """Corre func() cada stats.period ms.
+
+    El siguiente arranque se programa desde el anterior y no desde el fin
+    de la ejecución, así el periodo no acumula deriva. Si una ejecución
+    se retrasa más de un periodo, se salta a la siguiente ventana.
+
+    Las excepciones de func() se imprimen y se cuentan en stats.errors.
+
+    Args:
+        stats (TaskStats): Estadísticas de la tarea; define el periodo.
+        func (callable): Trabajo de cada periodo; si es una corrutina se
+            espera.
+    """
+    period = stats.period
+    due = ticks_ms()
+    while True:
+        late = ticks_diff(ticks_ms(), due)
+        stats.late(late)
+        start = ticks_us()
+        try:
+            result = func()
+            if result is not None and hasattr(result, 'send'):
+                await result
+        except Exception as e:
+            # Un error no detiene la tarea; se reintenta el siguiente periodo
+            stats.errors += 1
+            print('Error en tarea', stats.name, e)
+        stats.end(start)
+        due = ticks_add(due, period)
+        wait = ticks_diff(due, ticks_ms())
+        if wait < -period:
+            due = ticks_ms()  # Demasiado atrasada: no recuperar ejecuciones
+            wait = 0
+        await sleep_ms(max(wait, 0))
+
+
+async def report(stats, period=30000):
+    """Imprime y reinicia las estadísticas de las tareas cada period ms."""
+    while True:
+        await sleep_ms(period)
+        for s in stats:
+            print(s.report())
+            s.reset()
@@ -0,0 +1,515 @@
+"""Retained-mode widgets for ILI9341 dashboards."""
+from array import array
+from math import atan2, cos, sin, radians, degrees
+from ili9341 import color565
+
+ARC_START = 135  # Gauge arcs start bottom-left (degrees, y axis down)
+ARC_SWEEP = 270  # and sweep clockwise to bottom-right
+
+_arc_cache = {}  # (outer radius, inner radius, wedges) -> wedge spans
+
+
+def arc_wedges(r_out, r_in, count):
+    """Return the scanline spans of an annulus split into arc wedges.
+
+    Args:
+        r_out (int): Outer radius.
+        r_in (int): Inner radius.
+        count (int): Number of wedges over the ARC_SWEEP degree arc.
+    Returns:
+        list: One array('h') per wedge holding flat (dy, x0, x1) spans
+        relative to the center.
+    Note:
+        The annulus is rasterized once per geometry, in one pass, and
+        cached; drawing a wedge then costs one span per row it covers
+        (two where it straddles the inner hole).
+    """
+    key = (r_out, r_in, count)
+    wedges = _arc_cache.get(key)
+    if wedges is not None:
+        return wedges
+    wedges = [array('h') for _ in range(count)]
+    outer = r_out * r_out
+    inner = r_in * r_in
+    for dy in range(-r_out, r_out + 1):
+        run = -1  # Wedge of the current run
+        start = 0
+        for dx in range(-r_out, r_out + 2):
+            k = -1
+            d = dx * dx + dy * dy
+            if dx <= r_out and inner < d <= outer:
+                rel = (degrees(atan2(dy, dx)) - ARC_START) % 360
+                if rel < ARC_SWEEP:
+                    k = min(count - 1, int(rel * count / ARC_SWEEP))
+            if k != run:
+                if run >= 0:
+                    wedges[run].extend((dy, start, dx - 1))
+                run = k
+                start = dx
+    _arc_cache[key] = wedges
+    return wedges
+
+
+class Widget(object):
+    """Base widget with bounds, children and invalidation state.
+
+    Note:
+        render() redraws a widget only when it was invalidated.  A widget
+        that redraws forces its children to redraw too, since its
+        background covers them.
+    """
+
+    def __init__(self, x, y, w, h):
+        """Initialize widget.
+
+        Args:
+            x (int): Left position.
+            y (int): Top position.
+            w (int): Width.
+            h (int): Height.
+        """
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.children = []
+        self.dirty = True
+
+    def add(self, child):
+        """Add a child widget and return it."""
+        self.children.append(child)
+        return child
+
+    def draw(self, display):
+        """Draw the widget itself (children are drawn by render)."""
+        pass
+
+    def invalidate(self):
+        """Mark the widget for redraw on the next render."""
+        self.dirty = True
+
+    def render(self, display, force=False):
+        """Redraw the widget if invalidated, then render its children.
+
+        Args:
+            display (Display): Target display.
+            force (bool): Redraw even if not invalidated.
+        """
+        if self.dirty or force:
+            self.draw(display)
+            self.dirty = False
+            force = True
+        for child in self.children:
+            child.render(display, force)
+
+
+class Screen(Widget):
+    """Root of a widget tree covering the whole display."""
+
+    def __init__(self, display, background=0):
+        """Initialize screen.
+
+        Args:
+            display (Display): Target display.
+            background (int): RGB565 background color.
+        """
+        super().__init__(0, 0, display.width, display.height)
+        self.display = display
+        self.background = background
+        self.frame_bytes = 0  # Pixel bytes pushed by the last render
+        self.frame_blocks = 0  # Blocks pushed by the last render
+
+    def draw(self, display):
+        display.clear(self.background)
+
+    def render(self, display=None, force=False):
+        """Redraw invalidated widgets and measure the frame.
+
+        Returns:
+            int: Pixel bytes pushed to the display by this frame.
+        """
+        display = self.display
+        blocks = display.blocks_written
+        total = display.bytes_written
+        super().render(display, force)
+        display.flush()
+        self.frame_blocks = display.blocks_written - blocks
+        self.frame_bytes = display.bytes_written - total
+        return self.frame_bytes
+
+
+class Label(Widget):
+    """Single line of text with a fixed width in characters."""
+
+    def __init__(self, x, y, chars, color, background, text='', font=None,
+                 spacing=1):
+        """Initialize label.
+
+        Args:
+            x (int): Left position.
+            y (int): Top position.
+            chars (int): Width in characters; text is padded or cut.
+            color (int): RGB565 text color.
+            background (int): RGB565 background color.
+            text (string): Initial text.
+            font (XglcdFont): Font (default: built-in 8x8 font).
+            spacing (int): Pixels between letters for XglcdFont text.
+        """
+        if font is None:
+            w, h = chars * 8, 8
+        else:
+            w, h = chars * (font.width + spacing), font.height
+        super().__init__(x, y, w, h)
+        self.chars = chars
+        self.color = color
+        self.background = background
+        self.font = font
+        self.spacing = spacing
+        self.text = text
+
+    def draw(self, display):
+        # Padding to the full width overwrites the previous text
+        text = (self.text + ' ' * self.chars)[:self.chars]
+        if self.font is None:
+            display.draw_text8x8(self.x, self.y, text, self.color,
+                                 self.background)
+        else:
+            display.fill_rectangle(self.x, self.y, self.w, self.h,
+                                   self.background)
+            display.draw_text(self.x, self.y, text.rstrip(), self.font,
+                              self.color, self.background,
+                              spacing=self.spacing)
+
+    def set_text(self, text):
+        """Change the text, invalidating only if it differs."""
+        if text != self.text:
+            self.text = text
+            self.invalidate()
+
+
+class Panel(Widget):
+    """Filled panel with shadow, border and optional title."""
+
+    def __init__(self, x, y, w, h, color, border, title='', title_color=None,
+                 shadow=color565(200, 200, 200)):
+        """Initialize panel.
+
+        Args:
+            x (int): Left position.
+            y (int): Top position.
+            w (int): Width.
+            h (int): Height.
+            color (int): RGB565 fill color.
+            border (int): RGB565 border color.
+            title (string): Title drawn at the top left.
+            title_color (int): RGB565 title color (default: border color).
+            shadow (int): RGB565 shadow color (None for no shadow).
+        """
+        super().__init__(x, y, w, h)
+        self.color = color
+        self.border = border
+        self.shadow = shadow
+        if title:
+            self.add(Label(x + 10, y + 5, len(title),
+                           border if title_color is None else title_color,
+                           color, title))
+
+    def draw(self, display):
+        if self.shadow is not None:
+            display.fill_rectangle(self.x + 2, self.y + 2, self.w, self.h,
+                                   self.shadow)
+        display.fill_rectangle(self.x, self.y, self.w, self.h, self.color)
+        display.draw_rectangle(self.x, self.y, self.w, self.h, self.border)
+
+
+class LineChart(Widget):
+    """Line chart of a series scaled to its maximum value."""
+
+    def __init__(self, x, y, w, h, color, background, values=()):
+        """Initialize chart.
+
+        Args:
+            x (int): Left position.
+            y (int): Top position.
+            w (int): Width.
+            h (int): Height.
+            color (int): RGB565 line color.
+            background (int): RGB565 background color.
+            values (list): Initial series.
+        """
+        super().__init__(x, y, w, h)
+        self.color = color
+        self.background = background
+        self.values = list(values)
+
+    def draw(self, display):
+        display.fill_rectangle(self.x, self.y, self.w, self.h + 1,
+                               self.background)
+        values = self.values
+        count = len(values)
+        if count < 2:
+            return
+        top = max(values)
+        if top <= 0:
+            top = 1
+        points = [(self.x + int(i * (self.w / count)),
+                   self.y + self.h - int((v / top) * self.h))
+                  for i, v in enumerate(values)]
+        display.draw_polyline(points, self.color)
+
+    def set_values(self, values):
+        """Replace the series, invalidating only if it changed."""
+        values = list(values)
+        if values != self.values:
+            self.values = values
+            self.invalidate()
+
+
+class StripChart(Widget):
+    """Sweeping strip chart that draws one slot per new sample.
+
+    Note:
+        Samples live in a fixed array used as a ring of slots of `step`
+        pixels.  A new sample clears the slot `gap` positions ahead of the
+        cursor and draws the segment from the previous sample, so the cost
+        per sample is constant no matter how long the history is.  The
+        ILI9341 hardware scroll moves whole panel lines and can't scroll a
+        window inside a panel, hence the sweep instead.
+    """
+
+    def __init__(self, x, y, w, h, color, background, minimum=0,
+                 maximum=100, step=1, gap=4):
+        """Initialize strip chart.
+
+        Args:
+            x (int): Left position.
+            y (int): Top position.
+            w (int): Width.
+            h (int): Height of the plot (values map to y .. y + h).
+            color (int): RGB565 line color.
+            background (int): RGB565 background color.
+            minimum (int): Value drawn at the bottom.
+            maximum (int): Value drawn at the top.
+            step (int): Pixels per sample.
+            gap (int): Empty slots kept ahead of the cursor.
+        """
+        super().__init__(x, y, w, h + 1)
+        self.plot_h = h
+        self.color = color
+        self.background = background
+        self.minimum = minimum
+        self.span = max(1, maximum - minimum)
+        self.step = step
+        self.slots = w // step
+        self.gap = gap
+        self.values = array('H', [0] * self.slots)  # Ring of samples
+        self.cursor = 0  # Next slot to write
+        self.count = 0  # Valid samples in the ring
+        self.pending = 0  # Samples pushed but not drawn yet
+
+    def draw(self, display):
+        display.fill_rectangle(self.x, self.y, self.w, self.h,
+                               self.background)
+        slots = self.slots
+        n = min(self.count, slots - self.gap)
+        for k in range(n):
+            slot = (self.cursor - n + k) % slots
+            # The oldest sample joins a slot hidden in the gap, cleared below
+            self.draw_slot(display, slot, k > 0 or self.count > n)
+        if self.count > n:
+            for k in range(self.gap):
+                clear = (self.cursor + k) % slots
+                display.fill_rectangle(self.x + clear * self.step, self.y,
+                                       self.step, self.h, self.background)
+        self.pending = 0
+
+    def draw_slot(self, display, slot, connect):
+        """Draw the sample of a slot, joined to the previous slot."""
+        px = self.x + slot * self.step + self.step - 1
+        py = self.value_y(self.values[slot])
+        if connect and slot > 0:
+            display.draw_line(px - self.step,
+                              self.value_y(self.values[slot - 1]),
+                              px, py, self.color)
+        else:
+            display.draw_pixel(px, py, self.color)
+
+    def push(self, value):
+        """Add a sample; it is drawn on the next render."""
+        self.values[self.cursor] = max(0, min(0xffff, int(value)))
+        self.cursor = (self.cursor + 1) % self.slots
+        self.count = min(self.count + 1, self.slots)
+        self.pending += 1
+
+    def render(self, display, force=False):
+        """Draw pending samples, or everything if invalidated."""
+        if (self.dirty or force or
+                self.pending > self.slots - self.gap):
+            self.draw(display)
+            self.dirty = False
+            force = True
+        else:
+            slots = self.slots
+            while self.pending:
+                slot = (self.cursor - self.pending) % slots
+                # Open the gap ahead of the cursor
+                clear = (slot + self.gap) % slots
+                display.fill_rectangle(self.x + clear * self.step, self.y,
+                                       self.step, self.h, self.background)
+                self.draw_slot(display, slot, True)
+                self.pending -= 1
+        for child in self.children:
+            child.render(display, force)
+
+    def value_y(self, value):
+        """Return the y coordinate of a value, clamped to the plot."""
+        v = (value - self.minimum) * self.plot_h // self.span
+        return self.y + self.plot_h - max(0, min(self.plot_h, v))
+
+
+class Gauge(Widget):
+    """Arc gauge with optional needle, updated incrementally.
+
+    Note:
+        The arc is split into wedges whose spans come from arc_wedges.
+        A value change only redraws the wedges between the old and the
+        new value, the needle and the value label.
+    """
+
+    def __init__(self, x, y, size, border, text_color, background,
+                 maximum=100, title='', value=0, thickness=8, wedges=27,
+                 track=color565(200, 200, 200), needle=None):
+        """Initialize gauge.
+
+        Args:
+            x (int): Left position.
+            y (int): Top position.
+            size (int): Diameter.
+            border (int): RGB565 border color.
+            text_color (int): RGB565 text color.
+            background (int): RGB565 background color.
+            maximum (int): Value shown as a full gauge.
+            title (string): Title drawn below the gauge.
+            value (int): Initial value.
+            thickness (int): Arc thickness in pixels.
+            wedges (int): Arc resolution (value buckets).
+            track (int): RGB565 color of the unlit arc.
+            needle (int): RGB565 needle color (None for no needle).
+        """
+        super().__init__(x, y, size + 1, size + 1)
+        r = size // 2
+        self.cx = x + r
+        self.cy = y + r
+        self.radius = r
+        r_out = r - 3
+        self.needle_len = r_out - thickness - 2
+        self.wedges = arc_wedges(r_out, r_out - thickness, wedges)
+        last = max(1, wedges - 1)
+        # Color follows the arc position, so lit wedges never change color
+        self.colors = [color565(255 * k // last, 150 * (last - k) // last,
+                                150) for k in range(wedges)]
+        self.border = border
+        self.text_color = text_color
+        self.background = background
+        self.track = track
+        self.needle = needle
+        self.maximum = maximum
+        self.value = value
+        self.lit = 0  # Wedges lit on the display
+        self.needle_end = None  # Needle tip drawn on the display
+        self.value_label = self.add(Label(self.cx - 10, self.cy - 5, 4,
+                                          text_color, background))
+        self.value_label.text = '{}%'.format(value)
+        if title:
+            self.add(Label(self.cx - len(title) * 4, y + size + 5,
+                           len(title), text_color, background, title))
+
+    def draw(self, display):
+        display.fill_rectangle(self.x, self.y, self.w, self.h,
+                               self.background)
+        display.draw_circle(self.cx, self.cy, self.radius, self.border)
+        lit = self.lit_wedges()
+        for k in range(len(self.wedges)):
+            self.draw_wedge(display, k, self.colors[k] if k < lit
+                            else self.track)
+        self.lit = lit
+        self.needle_end = None
+        self.draw_needle(display)
+
+    def draw_needle(self, display):
+        """Move the needle to the current value."""
+        if self.needle is None:
+            return
+        angle = radians(ARC_START + ARC_SWEEP *
+                        min(max(self.value, 0), self.maximum) / self.maximum)
+        end = (self.cx + int(self.needle_len * cos(angle)),
+               self.cy + int(self.needle_len * sin(angle)))
+        if end == self.needle_end:
+            return
+        if self.needle_end is not None:
+            display.draw_line(self.cx, self.cy, self.needle_end[0],
+                              self.needle_end[1], self.background)
+        display.draw_line(self.cx, self.cy, end[0], end[1], self.needle)
+        self.needle_end = end
+        # The needle crosses the value label
+        self.value_label.invalidate()
+
+    def draw_wedge(self, display, k, color):
+        """Draw one arc wedge, one horizontal span per row."""
+        spans = self.wedges[k]
+        cx = self.cx
+        cy = self.cy
+        for i in range(0, len(spans), 3):
+            display.draw_hline(cx + spans[i + 1], cy + spans[i],
+                               spans[i + 2] - spans[i + 1] + 1, color)
+
+    def lit_wedges(self):
+        """Return the number of wedges lit by the current value."""
+        count = len(self.wedges)
+        return max(0, min(count, self.value * count // self.maximum))
+
+    def render(self, display, force=False):
+        """Redraw everything if invalidated, else only what the value
+        changed."""
+        if self.dirty or force:
+            self.draw(display)
+            self.dirty = False
+            force = True
+        else:
+            lit = self.lit_wedges()
+            for k in range(min(lit, self.lit), max(lit, self.lit)):
+                self.draw_wedge(display, k, self.colors[k] if k < lit
+                                else self.track)
+            self.lit = lit
+            self.draw_needle(display)
+        for child in self.children:
+            child.render(display, force)
+
+    def set_value(self, value):
+        """Change the value; the next render updates only the difference."""
+        self.value = value
+        self.value_label.set_text('{}%'.format(value))
+
+
+class StatusBar(Widget):
+    """Full width bar holding labels."""
+
+    def __init__(self, x, y, w, h, color):
+        """Initialize status bar.
+
+        Args:
+            x (int): Left position.
+            y (int): Top position.
+            w (int): Width.
+            h (int): Height.
+            color (int): RGB565 bar color.
+        """
+        super().__init__(x, y, w, h)
+        self.color = color
+
+    def add_label(self, x, chars, color, text=''):
+        """Add a label 2 pixels below the top of the bar and return it."""
+        return self.add(Label(x, self.y + 2, chars, color, self.color, text))
+
+    def draw(self, display):
+        display.fill_rectangle(self.x, self.y, self.w, self.h, self.color)
@@ -0,0 +1,198 @@
+"""
+Fuentes X-GLCD para Display.draw_text y draw_letter.
+
+Carga el formato de texto (arreglos hex estilo C) o el binario XGF1 que
+genera convertir_fuente.py; este último se lee de un solo golpe o, con
+lazy=True, glifo por glifo desde flash.
+"""
+from math import ceil, floor
+from collections import OrderedDict
+
+
+class XglcdFont(object):
+    """Font data in X-GLCD format."""
+    BIT_POS = {1: 0, 2: 2, 4: 4, 8: 6, 16: 8, 32: 10, 64: 12, 128: 14, 256: 16}
+
+    # Formato binario: cabecera (MAGIC, ancho, alto, primera letra,
+    # número de letras), tabla de anchos y tabla de glifos empaquetados
+    MAGIC = b'XGF1'
+    HEADER_SIZE = 8
+
+    def __init__(self, path, width, height, start_letter=32, letter_count=96,
+                 cache_bytes=4096, lazy=False):
+        with open(path, 'rb') as f:
+            header = f.read(self.HEADER_SIZE)
+        binary = header[0:4] == self.MAGIC
+        if binary:
+            # La cabecera del archivo manda sobre los argumentos
+            width, height, start_letter, letter_count = header[4:8]
+        self.width = width
+        self.height = max(height, 8)
+        self.start_letter = start_letter
+        self.letter_count = letter_count
+        self.bytes_per_letter = (floor((self.height - 1) / 8) + 1) * self.width + 1
+        # Caché LRU de glifos: (letra, color, fondo, orientación) -> (buf, w, h)
+        self.cache = OrderedDict()
+        self.cache_bytes = cache_bytes  # Presupuesto de RAM para la caché
+        self.cache_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.letters = None
+        self.glyph_file = None  # Archivo abierto en modo lazy
+        if binary:
+            self.__load_binary_font(path, lazy)
+        else:
+            self.__load_xglcd_font(path)
+
+    def __load_binary_font(self, path, lazy):
+        count = self.letter_count
+        self.widths = bytearray(count)
+        self.glyph_offset = self.HEADER_SIZE + count
+        f = open(path, 'rb')
+        f.seek(self.HEADER_SIZE)
+        f.readinto(self.widths)
+        if lazy:
+            # Los glifos se leen de flash bajo demanda
+            self.glyph_buf = bytearray(self.bytes_per_letter)
+            self.glyph_file = f
+            return
+        # Toda la tabla de glifos en una sola lectura
+        self.letters = bytearray(self.bytes_per_letter * count)
+        f.readinto(self.letters)
+        f.close()
+
+    def __load_xglcd_font(self, path):
+        bytes_per_letter = self.bytes_per_letter
+        self.letters = bytearray(bytes_per_letter * self.letter_count)
+        mv = memoryview(self.letters)
+        offset = 0
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if len(line) == 0 or line[0:2] != '0x':
+                    continue
+                comment = line.find('//')
+                if comment != -1:
+                    line = line[0:comment].strip()
+                if line.endswith(','):
+                    line = line[0:len(line) - 1]
+                mv[offset: offset + bytes_per_letter] = bytearray(
+                    int(b, 16) for b in line.split(','))
+                offset += bytes_per_letter
+        self.widths = bytearray(self.letters[i * bytes_per_letter]
+                                for i in range(self.letter_count))
+
+    def close(self):
+        if self.glyph_file is not None:
+            self.glyph_file.close()
+            self.glyph_file = None
+
+    def glyph(self, letter_ord):
+        # Bytes del glifo: ancho seguido de las columnas
+        bytes_per_letter = self.bytes_per_letter
+        offset = letter_ord * bytes_per_letter
+        if self.glyph_file is not None:
+            self.glyph_file.seek(self.glyph_offset + offset)
+            self.glyph_file.readinto(self.glyph_buf)
+            return memoryview(self.glyph_buf)
+        return memoryview(self.letters)[offset:offset + bytes_per_letter]
+
+    def lit_bits(self, n):
+        while n:
+            b = n & (~n+1)
+            yield self.BIT_POS[b]
+            n ^= b
+
+    def clear_cache(self):
+        self.cache = OrderedDict()
+        self.cache_used = 0
+
+    def get_letter(self, letter, color, background=0, landscape=False,
+                   rotate_180=False):
+        # El buffer devuelto se comparte con la caché: no modificarlo.
+        # La orientación (0, 90, 180 o 270) va en la llave, así los glifos
+        # girados 180° se guardan ya invertidos
+        orientation = (90 if landscape else 0) + (180 if rotate_180 else 0)
+        key = (letter, color, background, orientation)
+        entry = self.cache.pop(key, None)
+        if entry is not None:
+            self.hits += 1
+            self.cache[key] = entry  # Pasa a ser el más reciente
+            return entry
+        self.misses += 1
+        entry = self.render_letter(letter, color, background, landscape,
+                                   rotate_180)
+        size = len(entry[0])
+        if 0 < size <= self.cache_bytes:
+            # Desalojar los glifos menos usados hasta que quepa
+            while self.cache_used + size > self.cache_bytes:
+                oldest = next(iter(self.cache))
+                self.cache_used -= len(self.cache.pop(oldest)[0])
+            self.cache[key] = entry
+            self.cache_used += size
+        return entry
+
+    def render_letter(self, letter, color, background=0, landscape=False,
+                      rotate_180=False):
+        letter_ord = ord(letter) - self.start_letter
+        if letter_ord >= self.letter_count:
+            print('Font does not contain character: ' + letter)
+            return b'', 0, 0
+        mv = self.glyph(letter_ord)
+
+        letter_width = mv[0]
+        letter_height = self.height
+        letter_size = letter_height * letter_width
+        if background:
+            buf = bytearray(background.to_bytes(2, 'big') * letter_size)
+        else:
+            buf = bytearray(letter_size * 2)
+
+        msb, lsb = color.to_bytes(2, 'big')
+
+        if landscape:
+            pos = (letter_size * 2) - (letter_height * 2)
+            lh = letter_height
+            for b in mv[1:]:
+                for bit in self.lit_bits(b):
+                    buf[bit + pos] = msb
+                    buf[bit + pos + 1] = lsb
+                if lh > 8:
+                    pos += 16
+                    lh -= 8
+                else:
+                    pos -= (letter_height * 4) - (lh * 2)
+                    lh = letter_height
+        else:
+            col = 0
+            bytes_per_letter = ceil(letter_height / 8)
+            letter_byte = 0
+            for b in mv[1:]:
+                segment_size = letter_byte * letter_width * 16
+                for bit in self.lit_bits(b):
+                    pos = (bit * letter_width) + (col * 2) + segment_size
+                    buf[pos] = msb
+                    pos = (bit * letter_width) + (col * 2) + 1 + segment_size
+                    buf[pos] = lsb
+                letter_byte += 1
+                if letter_byte + 1 > bytes_per_letter:
+                    col += 1
+                    letter_byte = 0
+
+        if rotate_180:
+            # Invertir el orden de los píxeles gira el glifo 180°
+            i = 0
+            j = letter_size * 2 - 2
+            while i < j:
+                buf[i], buf[j] = buf[j], buf[i]
+                buf[i + 1], buf[j + 1] = buf[j + 1], buf[i + 1]
+                i += 2
+                j -= 2
+
+        return buf, letter_width, letter_height
+
+    def measure_text(self, text, spacing=1):
+        length = 0
+        for letter in text:
+            length += self.widths[ord(letter) - self.start_letter] + spacing
+        return length
@@ -1,5 +1,8 @@
 """XPT2046 Touch module."""
 from time import sleep
+from array import array
+from collections import deque
+import json
 
 
 class Touch(object):
@@ -15,9 +18,17 @@ class Touch(object):
     GET_BATTERY = const(0b10100000)  # Battery monitor
     GET_AUX = const(0b11100000)  # Auxiliary input to ADC
 
+    # Touch events returned by poll() / get_event() as (event, x, y)
+    PRESS = const(1)  # Pen went down
+    DRAG = const(2)  # Pen moved while down
+    RELEASE = const(3)  # Pen lifted (x, y of last position)
+    CONFIDENCE = const(5)  # Good samples averaged per position
+    MAX_DEVIATION = const(50)  # Maximum sample variance per position
+
     def __init__(self, spi, cs, int_pin=None, int_handler=None,
                  width=240, height=320,
-                 x_min=100, x_max=1962, y_min=100, y_max=1900):
+                 x_min=100, x_max=1962, y_min=100, y_max=1900,
+                 median=False, cal_file=None):
         """Initialize touch screen controller.
 
         Args:
@@ -31,6 +42,10 @@ class Touch(object):
             x_max (int): Maximum x coordinate
             y_min (int): Minimum Y coordinate
             y_max (int): Maximum Y coordinate
+            median (bool): Report the median of the samples instead of the
+                mean (default False)
+            cal_file (string): Calibration file saved by save_calibration,
+                loaded if present (default None)
         """
         self.spi = spi
         self.cs = cs
@@ -44,67 +59,204 @@ class Touch(object):
         self.x_max = x_max
         self.y_min = y_min
         self.y_max = y_max
-        self.x_multiplier = width / (x_max - x_min)
-        self.x_add = x_min * -self.x_multiplier
-        self.y_multiplier = height / (y_max - y_min)
-        self.y_add = y_min * -self.y_multiplier
+        # Affine calibration in 16.16 fixed point:
+        # x = (ax * raw_x + bx * raw_y + cx) >> 16, same for y
+        # (cx, cy include +0.5 so the shift rounds to nearest)
+        ax = (width << 16) // (x_max - x_min)
+        ay = (height << 16) // (y_max - y_min)
+        self.cal = array('l', [ax, 0, 0x8000 - x_min * ax,
+                               0, ay, 0x8000 - y_min * ay])
+        if cal_file is not None:
+            self.load_calibration(cal_file)
+
+        # Non-blocking sampling engine (see step and poll)
+        n = self.CONFIDENCE
+        self.median = median
+        self.samples_x = array('H', [0] * n)  # Sample ring buffer
+        self.samples_y = array('H', [0] * n)
+        self.sorted = array('H', [0] * n)  # Scratch for the median
+        self.sample_ptr = 0
+        self.sample_count = 0
+        self.sum_x = self.sum_y = 0  # Running sums over the ring
+        self.sum_xx = self.sum_yy = 0
+        self.touching = False
+        self.last_x = self.last_y = 0
+        self.events = deque((), 16)
+        self.timer = None
+        # Without an interrupt pin the pen is assumed down and every step
+        # samples the controller
+        self.pen_down = int_pin is None
+        self.int_handler = int_handler
 
         if int_pin is not None:
             self.int_pin = int_pin
             self.int_pin.init(int_pin.IN)
-            self.int_handler = int_handler
-            self.int_locked = False
+            self.pen_down = not int_pin.value()
             int_pin.irq(trigger=int_pin.IRQ_FALLING | int_pin.IRQ_RISING,
                         handler=self.int_press)
 
+    def add_sample(self, x, y):
+        """Add a raw sample to the ring buffer and filter it.
+
+        Args:
+            x (int): Raw X value.
+            y (int): Raw Y value.
+        Returns:
+            bool: True once CONFIDENCE samples are buffered and their
+            variance is at most MAX_DEVIATION.
+        Note:
+            Sums are updated incrementally as samples enter and leave the
+            ring, and the variance is compared in integers.
+        """
+        n = self.CONFIDENCE
+        ptr = self.sample_ptr
+        if self.sample_count == n:
+            # Drop the oldest sample from the running sums
+            ox = self.samples_x[ptr]
+            oy = self.samples_y[ptr]
+            self.sum_x -= ox
+            self.sum_y -= oy
+            self.sum_xx -= ox * ox
+            self.sum_yy -= oy * oy
+        else:
+            self.sample_count += 1
+        self.samples_x[ptr] = x
+        self.samples_y[ptr] = y
+        self.sum_x += x
+        self.sum_y += y
+        self.sum_xx += x * x
+        self.sum_yy += y * y
+        self.sample_ptr = (ptr + 1) % n
+        if self.sample_count < n:
+            return False
+        # n^2 * variance = n * sum(v^2) - sum(v)^2
+        sx = self.sum_x
+        sy = self.sum_y
+        dev = n * (self.sum_xx + self.sum_yy) - sx * sx - sy * sy
+        return dev <= self.MAX_DEVIATION * n * n
+
+    def calibrate(self, points):
+        """Set the affine calibration from three reference points.
+
+        Args:
+            points ([(int, int, int, int),...]): Three (screen x, screen y,
+                raw x, raw y) tuples, not on a line.
+        Note:
+            Solved once in floating point and stored as 16.16 fixed point
+            integers, so normalize() uses integer math only.
+        """
+        (sx0, sy0, rx0, ry0), (sx1, sy1, rx1, ry1), (sx2, sy2, rx2, ry2) = (
+            points)
+        det = (rx0 * (ry1 - ry2) - ry0 * (rx1 - rx2) +
+               (rx1 * ry2 - rx2 * ry1))
+        if det == 0:
+            raise ValueError('Calibration points must not be collinear.')
+        cal = self.cal
+        for i, (s0, s1, s2) in enumerate(((sx0, sx1, sx2), (sy0, sy1, sy2))):
+            a = (s0 * (ry1 - ry2) - ry0 * (s1 - s2) +
+                 (s1 * ry2 - s2 * ry1)) / det
+            b = (rx0 * (s1 - s2) - s0 * (rx1 - rx2) +
+                 (rx1 * s2 - rx2 * s1)) / det
+            c = (rx0 * (ry1 * s2 - ry2 * s1) - ry0 * (rx1 * s2 - rx2 * s1) +
+                 s0 * (rx1 * ry2 - rx2 * ry1)) / det
+            cal[i * 3] = round(a * 65536)
+            cal[i * 3 + 1] = round(b * 65536)
+            cal[i * 3 + 2] = round((c + 0.5) * 65536)
+
+    def filtered(self):
+        """Return the filtered raw X, Y position of the buffered samples.
+
+        Returns:
+            tuple(int, int): Median or mean raw X, Y.
+        """
+        n = self.CONFIDENCE
+        if self.median:
+            return (self.median_of(self.samples_x),
+                    self.median_of(self.samples_y))
+        return self.sum_x // n, self.sum_y // n
+
+    def get_event(self):
+        """Return the oldest queued touch event without blocking.
+
+        Returns:
+            tuple(int, int, int): (PRESS|DRAG|RELEASE, x, y) or None.
+        """
+        if self.events:
+            return self.events.popleft()
+        return None
+
     def get_touch(self):
         """Take multiple samples to get accurate touch reading."""
         timeout = 2  # set timeout to 2 seconds
-        confidence = 5
-        buff = [[0, 0] for x in range(confidence)]
-        buf_length = confidence  # Require a confidence of 5 good samples
-        buffptr = 0  # Track current buffer position
-        nsamples = 0  # Count samples
+        self.reset_filter()
         while timeout > 0:
-            if nsamples == buf_length:
-                meanx = sum([c[0] for c in buff]) // buf_length
-                meany = sum([c[1] for c in buff]) // buf_length
-                dev = sum([(c[0] - meanx)**2 +
-                          (c[1] - meany)**2 for c in buff]) / buf_length
-                if dev <= 50:  # Deviation should be under margin of 50
-                    return self.normalize(meanx, meany)
-            # get a new value
             sample = self.raw_touch()  # get a touch
             if sample is None:
-                nsamples = 0    # Invalidate buff
-            else:
-                buff[buffptr] = sample  # put in buff
-                buffptr = (buffptr + 1) % buf_length  # Incr, until rollover
-                nsamples = min(nsamples + 1, buf_length)  # Incr. until max
-
+                self.reset_filter()  # Invalidate buff
+            elif self.add_sample(*sample):
+                return self.normalize(*self.filtered())
             sleep(.05)
             timeout -= .05
         return None
 
     def int_press(self, pin):
-        """Send X,Y values to passed interrupt handler."""
-        if not pin.value() and not self.int_locked:
-            self.int_locked = True  # Lock Interrupt
-            buff = self.raw_touch()
+        """Pen interrupt: only record the pen state.
 
-            if buff is not None:
-                x, y = self.normalize(*buff)
-                self.int_handler(x, y)
-            sleep(.1)  # Debounce falling edge
-        elif pin.value() and self.int_locked:
-            sleep(.1)  # Debounce rising edge
-            self.int_locked = False  # Unlock interrupt
+        Sampling and the int_handler call happen later in step().
+        """
+        self.pen_down = not pin.value()
+
+    def load_calibration(self, path):
+        """Load calibration coefficients saved by save_calibration.
+
+        Args:
+            path (string): Calibration file path.
+        Returns:
+            bool: True if the file was loaded.
+        """
+        try:
+            with open(path) as f:
+                values = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if len(values) != 6:
+            return False
+        for i in range(6):
+            self.cal[i] = int(values[i])
+        return True
+
+    def median_of(self, samples):
+        """Return the median of the ring buffer without allocating.
+
+        Args:
+            samples (array): Ring buffer (samples_x or samples_y).
+        """
+        s = self.sorted
+        n = self.CONFIDENCE
+        # Insertion sort into the preallocated scratch array
+        for i in range(n):
+            v = samples[i]
+            j = i
+            while j > 0 and s[j - 1] > v:
+                s[j] = s[j - 1]
+                j -= 1
+            s[j] = v
+        return s[n >> 1]
 
     def normalize(self, x, y):
-        """Normalize mean X,Y values to match LCD screen."""
-        x = int(self.x_multiplier * x + self.x_add)
-        y = int(self.y_multiplier * y + self.y_add)
-        return x, y
+        """Normalize mean X,Y values to match LCD screen (fixed point)."""
+        c = self.cal
+        return ((c[0] * x + c[1] * y + c[2]) >> 16,
+                (c[3] * x + c[4] * y + c[5]) >> 16)
+
+    def poll(self):
+        """Run one sampling step and return the oldest queued event.
+
+        Returns:
+            tuple(int, int, int): (PRESS|DRAG|RELEASE, x, y) or None.
+        """
+        self.step()
+        return self.get_event()
 
     def raw_touch(self):
         """Read raw X,Y touch values.
@@ -119,6 +271,22 @@ class Touch(object):
         else:
             return None
 
+    def reset_filter(self):
+        """Invalidate the samples collected for the current position."""
+        self.sample_count = 0
+        self.sample_ptr = 0
+        self.sum_x = self.sum_y = 0
+        self.sum_xx = self.sum_yy = 0
+
+    def save_calibration(self, path):
+        """Save the calibration coefficients to a file.
+
+        Args:
+            path (string): Calibration file path.
+        """
+        with open(path, 'w') as f:
+            json.dump(list(self.cal), f)
+
     def send_command(self, command):
         """Write command to XT2046 (MicroPython).
 
@@ -134,3 +302,51 @@ class Touch(object):
 
         return (self.rx_buf[1] << 4) | (self.rx_buf[2] >> 4)
 
+    def start(self, timer, period=10):
+        """Run step() periodically from a hardware timer.
+
+        Args:
+            timer (Class Timer): Timer to use.
+            period (int): Milliseconds between samples (default 10).
+        Note:
+            On the ESP32 timer callbacks are soft interrupts, so SPI access
+            from step() is allowed.  Alternatively call poll() from the
+            main loop.
+        """
+        self.timer = timer
+        timer.init(period=period, mode=timer.PERIODIC,
+                   callback=lambda t: self.step())
+
+    def step(self):
+        """Take one touch sample without blocking.
+
+        A position is accepted once add_sample() reports CONFIDENCE
+        consecutive samples with a variance of at most MAX_DEVIATION.
+        Accepted positions queue PRESS or DRAG events, and losing the
+        pen queues RELEASE.
+        """
+        sample = self.raw_touch() if self.pen_down else None
+        if sample is None:
+            self.reset_filter()
+            if self.touching:
+                self.touching = False
+                self.events.append((self.RELEASE, self.last_x, self.last_y))
+            return
+        if not self.add_sample(*sample):
+            return
+        x, y = self.normalize(*self.filtered())
+        if not self.touching:
+            self.touching = True
+            self.events.append((self.PRESS, x, y))
+            if self.int_handler is not None:
+                self.int_handler(x, y)
+        elif x != self.last_x or y != self.last_y:
+            self.events.append((self.DRAG, x, y))
+        self.last_x = x
+        self.last_y = y
+
+    def stop(self):
+        """Stop timer driven sampling started with start()."""
+        if self.timer is not None:
+            self.timer.deinit()
+            self.timer = None